@@ -0,0 +1,6 @@
+-- Stored search embeddings for tables and fields (float32 x 1536 as bytes); NULL until computed
+IF COL_LENGTH('tables', 'embedding') IS NULL ALTER TABLE tables ADD embedding VARBINARY(MAX) NULL;
+IF COL_LENGTH('fields', 'embedding') IS NULL ALTER TABLE fields ADD embedding VARBINARY(MAX) NULL;
+-- Embeddings from older update_embeddings.py runs were stored as text; clear them to be recomputed
+UPDATE tables SET embedding = NULL WHERE DATALENGTH(embedding) <> 6144;
+UPDATE fields SET embedding = NULL WHERE DATALENGTH(embedding) <> 6144;
@@ -0,0 +1,7 @@
+-- Worker diagnostics and polling filter on status IN (...) and order by created_at. SQLAlchemy sends the
+-- status list as parameters, which a filtered index can't serve, so the index covers every status
+-- (ImportJob declares it too, so databases created by create_all already have it)
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'ix_import_jobs_active' AND object_id = OBJECT_ID('import_jobs') AND has_filter = 1)
+    DROP INDEX ix_import_jobs_active ON import_jobs;
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'ix_import_jobs_active' AND object_id = OBJECT_ID('import_jobs'))
+    CREATE INDEX ix_import_jobs_active ON import_jobs (status, created_at DESC) INCLUDE (updated_at);
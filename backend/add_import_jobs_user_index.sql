@@ -0,0 +1,4 @@
+-- Per-user job listing: WHERE user_id = ? [AND status IN (...)] ORDER BY created_at DESC
+-- (ImportJob declares it too, so databases created by create_all already have it)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'ix_import_jobs_user_created' AND object_id = OBJECT_ID('import_jobs'))
+    CREATE INDEX ix_import_jobs_user_created ON import_jobs (user_id, created_at DESC) INCLUDE (status);
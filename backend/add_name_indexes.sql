@@ -0,0 +1,7 @@
+-- Narrow name-only indexes: substring suggestion lookups scan these instead of the wide base tables
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'ix_tables_name' AND object_id = OBJECT_ID('tables'))
+    CREATE INDEX ix_tables_name ON tables (name);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'ix_fields_name' AND object_id = OBJECT_ID('fields'))
+    CREATE INDEX ix_fields_name ON fields (name);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'ix_categories_name' AND object_id = OBJECT_ID('categories'))
+    CREATE INDEX ix_categories_name ON categories (name);
@@ -0,0 +1,11 @@
+-- Store selected_tables inside import_jobs.config as a JSON array (older jobs kept it as a JSON-encoded string)
+UPDATE import_jobs
+SET config = JSON_MODIFY(config, '$.selected_tables', JSON_QUERY(JSON_VALUE(config, '$.selected_tables')))
+WHERE ISJSON(config) = 1
+  AND ISJSON(JSON_VALUE(config, '$.selected_tables')) = 1;
+
+-- config and failed_tables are read through SQLAlchemy's JSON type; reject anything that isn't JSON
+IF NOT EXISTS (SELECT 1 FROM sys.check_constraints WHERE name = 'CK_import_jobs_config_json')
+    ALTER TABLE import_jobs ADD CONSTRAINT CK_import_jobs_config_json CHECK (ISJSON(config) = 1);
+IF NOT EXISTS (SELECT 1 FROM sys.check_constraints WHERE name = 'CK_import_jobs_failed_tables_json')
+    ALTER TABLE import_jobs ADD CONSTRAINT CK_import_jobs_failed_tables_json CHECK (failed_tables IS NULL OR ISJSON(failed_tables) = 1);
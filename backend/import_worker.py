@@ -3,50 +3,44 @@ Independent import worker process
 Runs separately from the main API to avoid blocking
 """
 import time
-import requests
 import json
 import uuid as uuid_lib
 import signal
 import sys
-from datetime import datetime
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
 import os
 from dotenv import load_dotenv
+from database import SessionLocal
 from models import ImportJob, Database as DatabaseModel, Table as TableModel, Field as FieldModel, SourceSystem
 from routers.database_import.ai_descriptions import AIDescriptionGenerator
-from routers.database_import.models import TableField
+from routers.database_import.router import build_table_fields
+from routers.search import get_embeddings, embedding_to_bytes, table_embedding_text, field_embedding_text
+from routers.database_connections import get_connection_handler
 
 # Global flag for graceful shutdown
 shutdown_requested = False
 
 load_dotenv()
 
-SERVER = os.getenv("DB_SERVER")
-DATABASE = os.getenv("DB_NAME")
-USERNAME = os.getenv("DB_USERNAME")
-PASSWORD = os.getenv("DB_PASSWORD")
-
-CONNECTION_STRING = f"DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={SERVER};DATABASE={DATABASE};UID={USERNAME};PWD={PASSWORD};TrustServerCertificate=yes"
-engine = create_engine(
-    f"mssql+pyodbc:///?odbc_connect={CONNECTION_STRING}",
-    pool_size=3,
-    max_overflow=2,
-    pool_pre_ping=True
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# Dynamic BACKEND_URL configuration
-# Priority: 1. Environment variable, 2. Default to localhost
-def get_backend_url():
-    backend_url = os.getenv("BACKEND_URL") or os.getenv("VITE_API_URL")
-    if backend_url:
-        return backend_url.rstrip('/')  # Remove trailing slash if present
-    # Default to localhost for local development
-    return 'http://localhost:8000'
-
-BACKEND_URL = get_backend_url()
-print(f"Worker using BACKEND_URL: {BACKEND_URL}")
+# Tables of a job read from the source and described by the AI concurrently
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "8"))
+
+# Described tables are written (and job progress published) in batches of this many tables
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "20"))
+
+# How often (at most) a running job polls the database for cancellation from the frontend
+CANCEL_CHECK_SECONDS = float(os.getenv("IMPORT_CANCEL_CHECK_SECONDS", "5"))
+
+# An in_progress job not updated for this long is assumed orphaned (its worker died) and is taken over
+STALE_JOB_MINUTES = int(os.getenv("IMPORT_STALE_JOB_MINUTES", "15"))
+
+# A running job's updated_at is refreshed this often, independent of table progress, so a slow
+# batch never looks orphaned (must stay well under STALE_JOB_MINUTES)
+HEARTBEAT_SECONDS = float(os.getenv("IMPORT_HEARTBEAT_SECONDS", "60"))
 
 def signal_handler(signum, frame):
     """Handle shutdown signals gracefully"""
@@ -59,14 +53,133 @@ signal.signal(signal.SIGINT, signal_handler)  # Ctrl+C
 signal.signal(signal.SIGTERM, signal_handler)  # Termination signal
 
 def check_job_cancelled(job_id: str, db: Session) -> bool:
-    """Check if a job has been cancelled"""
-    job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
-    if job and job.status == 'cancelled':
-        return True
-    return False
+    """Check if a job has been cancelled.
+
+    Reads the status column itself: querying the ImportJob entity would hand back the
+    session's cached job, so a cancel written by the API since the last commit went unseen.
+    """
+    status = db.query(ImportJob.status).filter(ImportJob.id == job_id).scalar()
+    return status == 'cancelled'
+
+def disconnect_quietly(handler) -> None:
+    """Close a source connection, ignoring errors (it may already be broken)"""
+    try:
+        handler.disconnect()
+    except Exception as e:
+        print(f"Error closing source connection: {e}")
+
+def claim_job(job_id, db: Session) -> bool:
+    """Atomically mark a job in_progress; False if another worker already owns it.
+
+    Lets several worker processes poll the same table: only one UPDATE can move a
+    pending (or orphaned in_progress) job, so a job is never processed twice.
+    """
+    now = datetime.utcnow()
+    stale_before = now - timedelta(minutes=STALE_JOB_MINUTES)
+    claimed = db.query(ImportJob).filter(
+        ImportJob.id == job_id,
+        or_(
+            ImportJob.status == 'pending',
+            (ImportJob.status == 'in_progress') & or_(ImportJob.updated_at.is_(None), ImportJob.updated_at < stale_before)
+        )
+    ).update({ImportJob.status: 'in_progress', ImportJob.updated_at: now}, synchronize_session=False)
+    db.commit()
+    return claimed == 1
+
+def table_rows(database_id, table_name: str, description: str, record_count: int, table_fields, embeddings=None) -> tuple:
+    """Insert mappings for one described table and its fields.
+
+    The table id is generated here so the field rows can reference it before anything
+    is written. embeddings (table first, then each field) are stored for search when given.
+    """
+    table_id = uuid_lib.uuid4()
+    table_row = {
+        'id': table_id,
+        'database_id': database_id,
+        'name': table_name,
+        'description': description,
+        'record_count': record_count,
+        'last_imported': datetime.now()
+    }
+    field_rows = [{
+        'id': uuid_lib.uuid4(),
+        'table_id': table_id,
+        'name': field.fieldName,
+        'type': field.dataType,
+        'description': field.description or '',
+        'nullable': field.isNullable == 'YES',
+        'is_primary_key': field.isPrimaryKey == 'YES',
+        'is_foreign_key': field.isForeignKey == 'YES',
+        'default_value': field.defaultValue
+    } for field in table_fields]
+    if embeddings is not None:
+        for row, embedding in zip([table_row, *field_rows], embeddings):
+            row['embedding'] = embedding_to_bytes(embedding)
+    return table_name, table_row, field_rows
+
+def embed_table(table_name: str, description: str, table_fields):
+    """Search embeddings for a table and its fields in one request, or None (search embeds them later)"""
+    try:
+        return get_embeddings(
+            [table_embedding_text(table_name, description)] +
+            [field_embedding_text(field.fieldName, field.description, field.dataType, table_name) for field in table_fields]
+        )
+    except Exception as e:
+        print(f"Could not embed table {table_name}: {e}")
+        return None
+
+def insert_tables(db: Session, batch: list) -> list:
+    """Insert a batch of table_rows() results without committing; returns the names that failed.
+
+    The batch is tried as a whole first; if that fails each table is retried in its own
+    savepoint, so one bad row only fails its own table.
+    """
+    def insert(items):
+        with db.begin_nested():
+            # Plain mappings: no ORM objects or unit-of-work bookkeeping
+            db.bulk_insert_mappings(TableModel, [table_row for _, table_row, _ in items])
+            db.bulk_insert_mappings(FieldModel, [row for _, _, field_rows in items for row in field_rows])
+
+    try:
+        insert(batch)
+        return []
+    except Exception as e:
+        print(f"Batch insert of {len(batch)} tables failed, retrying one by one: {e}")
+
+    failed = []
+    for item in batch:
+        try:
+            insert([item])
+        except Exception as e:
+            print(f"Failed to import table {item[0]}: {e}")
+            failed.append(item[0])
+    return failed
+
+def keep_job_alive(job_id, stop: threading.Event):
+    """Bump an in_progress job's updated_at every HEARTBEAT_SECONDS until stopped.
+
+    Runs on its own thread and session, so the job stays visibly alive to claim_job
+    even while the processing thread waits on a slow table or AI call.
+    """
+    while not stop.wait(HEARTBEAT_SECONDS):
+        db = SessionLocal()
+        try:
+            db.query(ImportJob).filter(
+                ImportJob.id == job_id,
+                ImportJob.status == 'in_progress'
+            ).update({ImportJob.updated_at: datetime.utcnow()}, synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            print(f"Could not refresh heartbeat of job {job_id}: {e}")
+        finally:
+            db.close()
 
 def process_import_job(job_id: str, db: Session):
     """Process a single import job"""
+    # Source connections, one per pool thread, reused for every table that thread reads
+    sources = []
+    heartbeat_stop = threading.Event()
+    threading.Thread(target=keep_job_alive, args=(job_id, heartbeat_stop), daemon=True).start()
     try:
         job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
         if not job:
@@ -77,16 +190,13 @@ def process_import_job(job_id: str, db: Session):
         print(f"Config type: {type(job.config)}")
         print(f"Config value: {job.config}")
 
-        # Parse config if it's a string
-        if isinstance(job.config, str):
-            config = json.loads(job.config)
-        else:
-            config = job.config
+        # The JSON column already decodes config into a dict
+        config = job.config or {}
 
         print(f"Parsed config type: {type(config)}")
         print(f"Parsed config: {config}")
 
-        # Parse selected_tables with better error handling
+        # Parse selected_tables with better error handling (older jobs stored it as a JSON string)
         selected_tables_str = config.get('selected_tables', '[]')
         try:
             if isinstance(selected_tables_str, str):
@@ -107,6 +217,10 @@ def process_import_job(job_id: str, db: Session):
             db.commit()
             return
 
+        # Each job writes into a database entry it creates itself, so the only possible
+        # duplicates are repeated names in the selection; read and describe each table once
+        selected_tables = list(dict.fromkeys(selected_tables))
+
         print(f"Found {len(selected_tables)} tables to import: {selected_tables}")
 
         imported_count = 0
@@ -139,155 +253,121 @@ def process_import_job(job_id: str, db: Session):
             db.commit()
             return
 
-        # Process each table
-        for table_name in selected_tables:
-            # Check if job was cancelled or shutdown requested
-            if shutdown_requested:
-                print(f"Shutdown requested. Stopping job {job_id}")
-                job.status = 'cancelled'
-                job.error_message = 'Worker shutdown requested'
-                job.updated_at = datetime.utcnow()
-                job.completed_at = datetime.utcnow()
-                db.commit()
+        # Source connection settings (exclude selected_tables from config spread)
+        connection_config = {k: v for k, v in config.items() if k != 'selected_tables'}
+        connection_class = get_connection_handler(config.get('type'))
+
+        # Get source system info for AI context (same for every table in the job)
+        source_system = db.query(SourceSystem).filter(SourceSystem.id == config.get('source_id')).first()
+        source_name = source_system.name if source_system else "Unknown System"
+        source_description = source_system.description if source_system else None
+
+        # Field descriptions by (name, type), shared across the tables of this job
+        field_descriptions = {}
+
+        source_local = threading.local()
+
+        def describe_table(table_name: str):
+            """Read a table from the source and describe it (runs in a pool thread)"""
+            source = getattr(source_local, 'source', None)
+            if source is None:
+                source = connection_class(connection_config)
+                source.connect()
+                source_local.source = source
+                sources.append(source)
+            try:
+                # Get schema and record count (fast, no AI)
+                table_fields = build_table_fields(table_name, source.get_table_schema(table_name))
+                record_count = source.get_table_count(table_name)
+            except Exception:
+                # The source connection may be what broke; reconnect for the next table
+                source_local.source = None
+                sources.remove(source)
+                disconnect_quietly(source)
+                raise
+            print(f"Table {table_name} has {record_count} records")
+
+            # Generate AI descriptions in worker (background)
+            print(f"Generating AI descriptions for {len(table_fields)} fields of {table_name}...")
+            table_description, table_fields = AIDescriptionGenerator.generate_descriptions(
+                table_name, table_fields, source_name, source_description,
+                known=field_descriptions
+            )
+            embeddings = embed_table(table_name, table_description, table_fields)
+            return table_description, table_fields, record_count, embeddings
+
+        # Described tables not yet written to the database
+        batch = []
+
+        def write_batch():
+            """Write the buffered tables and publish progress in one commit"""
+            nonlocal imported_count
+            if not batch:
                 return
-            
-            # Check if job was cancelled from frontend
-            if check_job_cancelled(job_id, db):
-                print(f"Job {job_id} was cancelled. Stopping processing.")
-                job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
-                if job:
+            failed = insert_tables(db, batch)
+            failed_tables.extend(failed)
+            imported_count += len(batch) - len(failed)
+            batch.clear()
+            job.imported_tables = imported_count
+            job.failed_tables = list(failed_tables)
+            job.updated_at = datetime.utcnow()
+            db.commit()
+            print(f"Imported {imported_count}/{len(selected_tables)} tables")
+
+        next_cancel_check = 0.0
+
+        # Read and describe tables concurrently; database writes stay on this thread's session
+        with ThreadPoolExecutor(max_workers=IMPORT_WORKERS) as executor:
+            futures = {executor.submit(describe_table, table_name): table_name for table_name in selected_tables}
+
+            for future in as_completed(futures):
+                table_name = futures[future]
+
+                # Check if job was cancelled or shutdown requested
+                if shutdown_requested:
+                    print(f"Shutdown requested. Stopping job {job_id}")
+                    for pending in futures:
+                        pending.cancel()
+                    write_batch()
+                    job.imported_tables = imported_count
+                    job.failed_tables = list(failed_tables)
                     job.status = 'cancelled'
-                    job.error_message = 'Job cancelled by user'
+                    job.error_message = 'Worker shutdown requested'
                     job.updated_at = datetime.utcnow()
                     job.completed_at = datetime.utcnow()
                     db.commit()
-                return
-            
-            try:
-                print(f"Processing table: {table_name}")
-
-                # Get schema (fast, no AI) - exclude selected_tables from config spread
-                config_for_api = {k: v for k, v in config.items() if k != 'selected_tables'}
-                try:
-                    schema_response = requests.post(
-                        f"{BACKEND_URL}/api/database/schema",
-                        json={**config_for_api, 'tableName': table_name},
-                        timeout=60  # Should be fast now without AI
-                    )
-                    schema_response.raise_for_status()
-                    schema_data = schema_response.json()
-                except requests.exceptions.RequestException as e:
-                    print(f"Failed to connect to backend API at {BACKEND_URL}: {e}")
-                    raise Exception(f"Backend API unavailable: {str(e)}")
-
-                # Get source system info for AI context
-                source_system = db.query(SourceSystem).filter(SourceSystem.id == config.get('source_id')).first()
-                source_name = source_system.name if source_system else "Unknown System"
-                source_description = source_system.description if source_system else None
-
-                # Convert fields to TableField objects
-                table_fields = [TableField(
-                    tableName=table_name,
-                    fieldName=field['fieldName'],
-                    dataType=field['dataType'],
-                    isNullable=field['isNullable'],
-                    isPrimaryKey=field['isPrimaryKey'],
-                    isForeignKey=field['isForeignKey'],
-                    defaultValue=field['defaultValue']
-                ) for field in schema_data.get('fields', [])]
-
-                # Generate AI descriptions in worker (background)
-                print(f"Generating AI descriptions for {len(table_fields)} fields...")
-                # Update job status before long-running AI operation
-                db.refresh(job)
-                if job.status == 'cancelled':
-                    print(f"Job {job_id} was cancelled before AI generation. Stopping.")
                     return
-                job.updated_at = datetime.utcnow()
-                db.commit()
-                
-                table_description = AIDescriptionGenerator.generate_table_description(
-                    table_name, table_fields, source_name, source_description
-                )
-                table_fields = AIDescriptionGenerator.generate_field_descriptions(
-                    table_name, table_fields, source_name, source_description
-                )
-                print(f"AI descriptions generated")
-
-                # Get table record count
-                print(f"Counting records in {table_name}...")
-                # Update job status before potentially long-running count operation
-                db.refresh(job)
-                if job.status == 'cancelled':
-                    print(f"Job {job_id} was cancelled before record count. Stopping.")
-                    return
-                job.updated_at = datetime.utcnow()
-                db.commit()
-                
-                from routers.database_connections import get_connection_handler
-                connection_class = get_connection_handler(config.get('type'))
-                handler = connection_class(config_for_api)
-                with handler:
-                    record_count = handler.get_table_count(table_name)
-                print(f"Table {table_name} has {record_count} records")
-
-                # Create table with stats
-                new_table = TableModel(
-                    id=uuid_lib.uuid4(),
-                    database_id=created_db_id,
-                    name=table_name,
-                    description=table_description,
-                    record_count=record_count,
-                    last_imported=datetime.now()
-                )
-                db.add(new_table)
-                db.flush()
-
-                # Bulk create fields
-                fields_to_add = []
-                for field in table_fields:
-                    new_field = FieldModel(
-                        id=uuid_lib.uuid4(),
-                        table_id=new_table.id,
-                        name=field.fieldName,
-                        type=field.dataType,
-                        description=field.description or '',
-                        nullable=field.isNullable == 'YES',
-                        is_primary_key=field.isPrimaryKey == 'YES',
-                        is_foreign_key=field.isForeignKey == 'YES',
-                        default_value=field.defaultValue
-                    )
-                    fields_to_add.append(new_field)
-
-                db.bulk_save_objects(fields_to_add)
-                db.commit()
 
-                imported_count += 1
-                print(f"Imported table {table_name} ({imported_count}/{len(selected_tables)})")
+                # Check if job was cancelled from frontend (throttled; the final update re-checks)
+                if time.monotonic() >= next_cancel_check:
+                    next_cancel_check = time.monotonic() + CANCEL_CHECK_SECONDS
+                    if check_job_cancelled(job_id, db):
+                        print(f"Job {job_id} was cancelled. Stopping processing.")
+                        for pending in futures:
+                            pending.cancel()
+                        break
 
-                # Update progress after each table (for better UX)
-                # Refresh job to get latest status
-                db.refresh(job)
-                if job.status == 'cancelled':
-                    print(f"Job {job_id} was cancelled during processing. Stopping.")
-                    return
-                
-                job.imported_tables = imported_count
-                job.updated_at = datetime.utcnow()
-                db.commit()
+                try:
+                    table_description, table_fields, record_count, embeddings = future.result()
+                except Exception as e:
+                    # Failures are only recorded in memory; they are persisted with the next commit
+                    print(f"Failed to import table {table_name}: {e}")
+                    failed_tables.append(table_name)
+                    continue
 
-            except Exception as e:
-                print(f"Failed to import table {table_name}: {e}")
-                db.rollback()
-                failed_tables.append(table_name)
-                job.failed_tables = json.dumps(failed_tables)
-                job.updated_at = datetime.utcnow()
-                db.commit()
+                batch.append(table_rows(created_db_id, table_name, table_description, record_count, table_fields, embeddings))
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    write_batch()
+
+        # Tables described before the end (or a cancellation) are still saved
+        write_batch()
 
         # Final update - check if job was cancelled before finalizing
         db.refresh(job)
         if job.status == 'cancelled':
             print(f"Job {job_id} was cancelled. Finalizing cancellation.")
+            job.imported_tables = imported_count
+            job.failed_tables = list(failed_tables)
             job.error_message = f'Job cancelled. {imported_count} tables were imported before cancellation.'
             job.completed_at = datetime.utcnow()
             db.commit()
@@ -297,7 +377,7 @@ def process_import_job(job_id: str, db: Session):
         job.updated_at = datetime.utcnow()
         final_status = 'completed' if failed_tables == [] else ('failed' if imported_count == 0 else 'completed')
         job.status = final_status
-        job.failed_tables = json.dumps(failed_tables)
+        job.failed_tables = list(failed_tables)
         job.database_id = created_db_id
         job.error_message = f'{len(failed_tables)} tables failed' if failed_tables else None
         job.completed_at = datetime.utcnow()
@@ -323,6 +403,10 @@ def process_import_job(job_id: str, db: Session):
         except Exception as db_error:
             print(f"CRITICAL: Failed to update job status in database: {db_error}")
             print(f"Traceback: {traceback.format_exc()}")
+    finally:
+        heartbeat_stop.set()
+        for source in sources:
+            disconnect_quietly(source)
 
 def main():
     """Main worker loop - polls for pending jobs"""
@@ -334,7 +418,7 @@ def main():
         db = SessionLocal()
         try:
             # Find pending jobs (also check for in_progress jobs that might need resuming)
-            # Exclude cancelled, completed, and failed jobs
+            # Exclude cancelled, completed, and failed jobs; claim_job decides which we may take
             pending_jobs = db.query(ImportJob).filter(
                 ImportJob.status.in_(['pending', 'in_progress'])
             ).filter(
@@ -351,11 +435,9 @@ def main():
                     if job.status == 'cancelled':
                         continue
                     
-                    # Mark as in progress if it was pending
-                    if job.status == 'pending':
-                        job.status = 'in_progress'
-                        job.updated_at = datetime.utcnow()
-                        db.commit()
+                    # Mark as in progress, unless another worker is already processing it
+                    if not claim_job(job.id, db):
+                        continue
 
                     # Process the job
                     process_import_job(str(job.id), db)
@@ -5,7 +5,7 @@ from pydantic import BaseModel, UUID4
 from typing import Optional, List, Dict
 from datetime import datetime, timedelta
 import uvicorn
-from sqlalchemy import create_engine, Column, String, Boolean, DateTime, ForeignKey, Text, func, Integer, NVARCHAR, delete
+from sqlalchemy import create_engine, Column, String, Boolean, DateTime, ForeignKey, Text, func, Integer, NVARCHAR, JSON, Index, delete, update
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
 from sqlalchemy.dialects.mssql import UNIQUEIDENTIFIER
 import os
@@ -19,6 +19,7 @@ from config import ADMIN_USERS, MANAGER_USERS, JWT_SECRET, JWT_ALGORITHM, JWT_EX
 from routers.database_import import router as database_import_router
 from routers import search
 from routers import import_jobs
+import models
 
 # Configure logging
 logging.basicConfig(
@@ -143,17 +144,24 @@ class ImportJob(Base):
     __tablename__ = "import_jobs"
     id = Column(UNIQUEIDENTIFIER, primary_key=True, default=uuid.uuid4)
     user_id = Column(NVARCHAR(255), nullable=False)
-    config = Column(Text, nullable=False)
+    config = Column(JSON(none_as_null=True), nullable=False)
     status = Column(NVARCHAR(50), nullable=False)
     total_tables = Column(Integer, default=0)
     imported_tables = Column(Integer, default=0)
-    failed_tables = Column(Text)
+    failed_tables = Column(JSON(none_as_null=True))
     error_message = Column(Text)
     database_id = Column(UNIQUEIDENTIFIER)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     completed_at = Column(DateTime)
 
+    # Per-user job listing: WHERE user_id = ? [AND status IN (...)] ORDER BY created_at DESC;
+    # active jobs (diagnostics, worker polling): WHERE status IN (...) ORDER BY created_at
+    __table_args__ = (
+        Index('ix_import_jobs_user_created', user_id, created_at.desc(), mssql_include=['status']),
+        Index('ix_import_jobs_active', status, created_at.desc(), mssql_include=['updated_at']),
+    )
+
 # Create tables if they don't exist
 Base.metadata.create_all(bind=engine)
 
@@ -515,6 +523,13 @@ def update_table(table_id: UUID4, table: dict, user = Depends(get_current_user),
         
         for key, value in table.items():
             setattr(db_table, key, value)
+        # The stored search embedding describes the old name/description; search recomputes it.
+        # The column is mapped on models.Table/models.Field only, so it is cleared through those
+        if 'name' in table or 'description' in table:
+            db.execute(update(models.Table).where(models.Table.id == table_id).values(embedding=None))
+        # Field embeddings include the table name
+        if 'name' in table:
+            db.execute(update(models.Field).where(models.Field.table_id == table_id).values(embedding=None))
         
         db.commit()
         db.refresh(db_table)
@@ -620,6 +635,8 @@ def update_field(field_id: UUID4, field: dict, user = Depends(get_current_user),
         
         for key, value in field.items():
             setattr(db_field, key, value)
+        if {'name', 'description', 'type'} & field.keys():
+            db.execute(update(models.Field).where(models.Field.id == field_id).values(embedding=None))
         
         db.commit()
         db.refresh(db_field)
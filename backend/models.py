@@ -1,5 +1,5 @@
-from sqlalchemy import create_engine, Column, String, Boolean, DateTime, ForeignKey, Text, func, Integer, NVARCHAR
-from sqlalchemy.orm import sessionmaker, Session, declarative_base
+from sqlalchemy import create_engine, Column, String, Boolean, DateTime, ForeignKey, Text, func, Integer, NVARCHAR, JSON, Index, LargeBinary
+from sqlalchemy.orm import sessionmaker, Session, declarative_base, deferred
 from sqlalchemy.dialects.mssql import UNIQUEIDENTIFIER
 import uuid
 
@@ -32,6 +32,8 @@ class Table(Base):
     description = Column(NVARCHAR(2000))  # Increased from 1000 to 2000 characters
     record_count = Column(Integer)
     last_imported = Column(DateTime)
+    # Search embedding (float32 bytes, see routers/search.py); deferred so it is only loaded when asked for
+    embedding = deferred(Column(LargeBinary))
 
 class Field(Base):
     __tablename__ = "fields"
@@ -44,6 +46,7 @@ class Field(Base):
     is_primary_key = Column(Boolean, default=False)
     is_foreign_key = Column(Boolean, default=False)
     default_value = Column(NVARCHAR(255))
+    embedding = deferred(Column(LargeBinary))
 
 class Category(Base):
     __tablename__ = "categories"
@@ -55,13 +58,20 @@ class ImportJob(Base):
     __tablename__ = "import_jobs"
     id = Column(UNIQUEIDENTIFIER, primary_key=True, default=uuid.uuid4)
     user_id = Column(NVARCHAR(255), nullable=False)
-    config = Column(Text, nullable=False)
+    config = Column(JSON(none_as_null=True), nullable=False)
     status = Column(NVARCHAR(50), nullable=False)
     total_tables = Column(Integer, default=0)
     imported_tables = Column(Integer, default=0)
-    failed_tables = Column(Text)
+    failed_tables = Column(JSON(none_as_null=True))
     error_message = Column(Text)
     database_id = Column(UNIQUEIDENTIFIER)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
-    completed_at = Column(DateTime)
\ No newline at end of file
+    completed_at = Column(DateTime)
+
+    # Per-user job listing: WHERE user_id = ? [AND status IN (...)] ORDER BY created_at DESC;
+    # active jobs (diagnostics, worker polling): WHERE status IN (...) ORDER BY created_at
+    __table_args__ = (
+        Index('ix_import_jobs_user_created', user_id, created_at.desc(), mssql_include=['status']),
+        Index('ix_import_jobs_active', status, created_at.desc(), mssql_include=['updated_at']),
+    )
\ No newline at end of file
@@ -25,13 +25,13 @@ import logging
 import os
 import re
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 from openai import OpenAI
 
 from .models import TableField
-from .banking_intelligence import BankingIntelligence
+from .banking_intelligence import get_enhanced_field_fallback, get_enhanced_table_fallback
 
 # -----------------------------------------------------------------------------
 # Setup
@@ -215,6 +215,13 @@ TOKEN_HINTS = {
     "ACCOUNT_NUMBER": "Account number",
 }
 
+# One alternation over all tokens, longest first, so the first alternative that
+# matches at a position is already the most specific one (no post-selection).
+_TOKEN_HINTS_RE = re.compile(
+    r"\b(" + "|".join(re.escape(t) for t in sorted(TOKEN_HINTS, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE,
+)
+
 def _rewrite_tokens(text: str, field_name: Optional[str] = None) -> str:
     """Map known tokens (if present) to human phrasing. No vendor mentions."""
     t = text or ""
@@ -224,10 +231,8 @@ def _rewrite_tokens(text: str, field_name: Optional[str] = None) -> str:
         # if the model returned something generic, replace entirely
         if len(t.strip()) < 10 or any(b in t.lower() for b in FORBIDDEN_PHRASES):
             return TOKEN_HINTS[key]
-    # otherwise replace token occurrences inside the text
-    for token, friendly in TOKEN_HINTS.items():
-        if re.search(rf"\b{re.escape(token)}\b", t, re.IGNORECASE):
-            t = re.sub(rf"\b{re.escape(token)}\b", friendly, t, flags=re.IGNORECASE)
+    # otherwise replace token occurrences inside the text in a single pass
+    t = _TOKEN_HINTS_RE.sub(lambda m: TOKEN_HINTS[m.group(1).upper()], t)
     return re.sub(r"\s{2,}", " ", t).strip()
 
 # -----------------------------------------------------------------------------
@@ -248,6 +253,91 @@ MANUAL_OVERRIDES: Dict[str, Dict[str, str]] = {
 _CACHE_TABLE: Dict[str, str] = {}
 _CACHE_FIELDS: Dict[str, Dict[str, str]] = {}
 
+# -----------------------------------------------------------------------------
+# Post-processing (shared by the separate and combined generators)
+# -----------------------------------------------------------------------------
+
+def _finish_table_description(
+    desc: Optional[str],
+    table_name: str,
+    source_name: Optional[str],
+    fields: List[TableField],
+    schema_key: str,
+) -> str:
+    """Rewrite/clean a model table description, falling back if unusable; caches the result."""
+    desc = _rewrite_tokens((desc or "").strip())    # token expansions if present
+    desc = _clean_text(desc, TABLE_DESC_LIMIT)
+
+    if _is_bad(desc):
+        desc = get_enhanced_table_fallback(table_name, source_name, fields)
+
+    if ENABLE_CACHE:
+        _CACHE_TABLE[schema_key] = desc
+
+    logger.info(f"Generated AI table description for {table_name}: {desc}")
+    return desc
+
+def _finish_field_descriptions(
+    field_map: dict,
+    table_name: str,
+    source_name: Optional[str],
+    fields: List[TableField],
+    schema_key: str,
+    known: Optional[Dict[Tuple[str, str], str]] = None,
+) -> List[TableField]:
+    """Apply model field meanings (overrides/known first, fallbacks last); caches the result."""
+    table_overrides = MANUAL_OVERRIDES.get(table_name, {})
+
+    result_map: Dict[str, str] = {}
+    for f in fields:
+        key = (f.fieldName, f.dataType)
+        if known and key in known and f.fieldName not in table_overrides:
+            f.description = result_map[f.fieldName] = known[key]
+            continue
+
+        # manual override first
+        desc = table_overrides.get(f.fieldName)
+        if not desc:
+            desc = field_map.get(f.fieldName, "")
+
+        if not desc:
+            desc = get_enhanced_field_fallback(
+                f.fieldName, f.dataType, source_name, table_name
+            )
+
+        # token-based rewrite + cleanup
+        desc = _rewrite_tokens(desc, field_name=f.fieldName)
+        desc = _clean_text(desc, FIELD_DESC_LIMIT)
+        if _is_bad(desc):
+            desc = get_enhanced_field_fallback(
+                f.fieldName, f.dataType, source_name, table_name
+            )
+            desc = _clean_text(desc, FIELD_DESC_LIMIT)
+
+        f.description = desc
+        result_map[f.fieldName] = desc
+        if known is not None:
+            known[key] = desc
+
+    if ENABLE_CACHE:
+        _CACHE_FIELDS[schema_key] = result_map
+
+    logger.info(f"Generated AI field descriptions for {len(fields)} fields in table {table_name}")
+    return fields
+
+def _fallback_field_descriptions(
+    table_name: str,
+    source_name: Optional[str],
+    fields: List[TableField],
+) -> List[TableField]:
+    """Fallback meanings for every field when the model call failed; not cached, so a later import retries."""
+    for f in fields:
+        f.description = get_enhanced_field_fallback(
+            f.fieldName, f.dataType, source_name, table_name
+        )
+        f.description = _clean_text(f.description, FIELD_DESC_LIMIT)
+    return fields
+
 # -----------------------------------------------------------------------------
 # Generator
 # -----------------------------------------------------------------------------
@@ -275,7 +365,7 @@ class AIDescriptionGenerator:
             if ovr:
                 desc = _clean_text(_rewrite_tokens(ovr), TABLE_DESC_LIMIT)
                 if _is_bad(desc):
-                    desc = BankingIntelligence.get_enhanced_table_fallback(table_name, source_name, fields)
+                    desc = get_enhanced_table_fallback(table_name, source_name, fields)
                 if ENABLE_CACHE:
                     _CACHE_TABLE[schema_key] = desc
                 return desc
@@ -323,22 +413,11 @@ Rules:
 """.strip()
 
             data = _ask_json(prompt, max_tokens=max(220, TABLE_DESC_LIMIT + 100))
-            desc = (data.get("description") or "").strip()
-            desc = _rewrite_tokens(desc)          # token expansions if present
-            desc = _clean_text(desc, TABLE_DESC_LIMIT)
-
-            if _is_bad(desc):
-                desc = BankingIntelligence.get_enhanced_table_fallback(table_name, source_name, fields)
-
-            if ENABLE_CACHE:
-                _CACHE_TABLE[schema_key] = desc
-
-            logger.info(f"Generated AI table description for {table_name}: {desc}")
-            return desc
+            return _finish_table_description(data.get("description"), table_name, source_name, fields, schema_key)
 
         except Exception as e:
             logger.error(f"Error generating AI table description: {e}")
-            return BankingIntelligence.get_enhanced_table_fallback(table_name, source_name, fields)
+            return get_enhanced_table_fallback(table_name, source_name, fields)
 
     @staticmethod
     def generate_field_descriptions(
@@ -348,7 +427,14 @@ Rules:
         source_description: Optional[str] = None,
         database_name: Optional[str] = None,
         database_description: Optional[str] = None,
+        known: Optional[Dict[Tuple[str, str], str]] = None,
     ) -> List[TableField]:
+        """
+        Describe every field of a table. `known` maps (fieldName, dataType) to a
+        description produced earlier (e.g. for another table of the same import);
+        those fields are reused as-is and only the remaining ones go to the model.
+        New descriptions are added to `known`.
+        """
         try:
             # Cache by schema
             schema_key = _schema_hash(table_name, fields)
@@ -358,15 +444,18 @@ Rules:
                     f.description = mapping.get(f.fieldName) or f.description
                 return fields
 
-            # Manual overrides
-            table_overrides = MANUAL_OVERRIDES.get(table_name, {})
+            # Only ask the model about fields not already described in this run
+            if known:
+                pending = [f for f in fields if (f.fieldName, f.dataType) not in known]
+            else:
+                pending = fields
 
-            fields_context = _sanitize_fields_for_prompt(fields)
+            fields_context = _sanitize_fields_for_prompt(pending)
 
             vocab = _tokens_from_text(
                 source_name, source_description, database_name, database_description, table_name
             )
-            field_tokens = _tokens_from_text(" ".join(f.fieldName for f in fields), max_tokens=20)
+            field_tokens = _tokens_from_text(" ".join(f.fieldName for f in pending), max_tokens=20)
             vocab = (vocab + field_tokens)[:40]
 
             fewshot_fields = (
@@ -396,43 +485,104 @@ Rules:
 {fewshot_fields}
 """.strip()
 
-            data = _ask_json(prompt, max_tokens=max(2600, FIELD_DESC_LIMIT * 20))
+            data = _ask_json(prompt, max_tokens=max(2600, FIELD_DESC_LIMIT * 20)) if pending else {}
+            field_map = data if isinstance(data, dict) else {}
+            return _finish_field_descriptions(field_map, table_name, source_name, fields, schema_key, known)
 
-            result_map: Dict[str, str] = {}
-            for f in fields:
-                # manual override first
-                desc = table_overrides.get(f.fieldName)
-                if not desc:
-                    desc = data.get(f.fieldName, "") if isinstance(data, dict) else ""
+        except Exception as e:
+            logger.error(f"Error generating AI field descriptions: {e}")
+            return _fallback_field_descriptions(table_name, source_name, fields)
 
-                if not desc:
-                    desc = BankingIntelligence.get_enhanced_field_fallback(
-                        f.fieldName, f.dataType, source_name, table_name
-                    )
+    @staticmethod
+    def generate_descriptions(
+        table_name: str,
+        fields: List[TableField],
+        source_name: Optional[str] = None,
+        source_description: Optional[str] = None,
+        database_name: Optional[str] = None,
+        database_description: Optional[str] = None,
+        known: Optional[Dict[Tuple[str, str], str]] = None,
+    ) -> Tuple[str, List[TableField]]:
+        """
+        Table description and field descriptions from a single model call (one round
+        trip per table instead of two). Same caching, overrides, `known` reuse and
+        fallbacks as generate_table_description / generate_field_descriptions.
+        """
+        schema_key = _schema_hash(table_name, fields)
+        cached = ENABLE_CACHE and (schema_key in _CACHE_TABLE or schema_key in _CACHE_FIELDS)
+        if cached or MANUAL_OVERRIDES.get(table_name, {}).get("__table__"):
+            table_description = AIDescriptionGenerator.generate_table_description(
+                table_name, fields, source_name, source_description, database_name, database_description
+            )
+            fields = AIDescriptionGenerator.generate_field_descriptions(
+                table_name, fields, source_name, source_description, database_name, database_description, known
+            )
+            return table_description, fields
 
-                # token-based rewrite + cleanup
-                desc = _rewrite_tokens(desc, field_name=f.fieldName)
-                desc = _clean_text(desc, FIELD_DESC_LIMIT)
-                if _is_bad(desc):
-                    desc = BankingIntelligence.get_enhanced_field_fallback(
-                        f.fieldName, f.dataType, source_name, table_name
-                    )
-                    desc = _clean_text(desc, FIELD_DESC_LIMIT)
+        try:
+            if known:
+                pending = [f for f in fields if (f.fieldName, f.dataType) not in known]
+            else:
+                pending = fields
 
-                f.description = desc
-                result_map[f.fieldName] = desc
+            field_list = _sanitize_fields_for_prompt(fields)
 
-            if ENABLE_CACHE:
-                _CACHE_FIELDS[schema_key] = result_map
+            vocab = _tokens_from_text(
+                source_name, source_description, database_name, database_description, table_name
+            )
+            field_tokens = _tokens_from_text(" ".join(f.fieldName for f in fields), max_tokens=20)
+            vocab = (vocab + field_tokens)[:40]
 
-            logger.info(f"Generated AI field descriptions for {len(fields)} fields in table {table_name}")
-            return fields
+            if pending is fields:
+                fields_to_describe = "every field listed above"
+            else:
+                fields_to_describe = "these fields only: " + ", ".join(f.fieldName for f in pending)
 
+            fewshot = (
+                'Example output: {"description": "Concise business summary of what this table stores '
+                'and why it exists", "fields": {"ID": "Unique identifier", "CREATED_DATE": "Creation date (YYYYMMDD)"}}'
+            )
+
+            prompt = f"""
+You write SHORT BUSINESS descriptions for a data table and its fields using ONLY the provided context terms.
+Do NOT invent vendor/product names. Prefer terms found in the context below.
+
+Context:
+- Source Name: {source_name or ""}
+- Source Description: {source_description or ""}
+- Database Name: {database_name or ""}
+- Database Description: {database_description or ""}
+- Table Name: {table_name}
+Prefer these context words if relevant: {", ".join(vocab) if vocab else "(none)"}
+
+Fields (name, type, flags):
+{field_list}
+
+Rules:
+- "description": the BUSINESS purpose of the table (what it stores and why), ≤ {TABLE_DESC_LIMIT} characters.
+- "fields": one short BUSINESS meaning (how an analyst/user would read it), ≤ {FIELD_DESC_LIMIT} characters, for {fields_to_describe}.
+- Be specific; avoid filler like "business data", "information", "data field".
+- Output ONE JSON object only: {{"description": "...", "fields": {{ "FIELD_NAME": "meaning", ... }}}}.
+{fewshot}
+""".strip()
+
+            data = _ask_json(prompt, max_tokens=max(2600, FIELD_DESC_LIMIT * 20) + TABLE_DESC_LIMIT + 100)
         except Exception as e:
-            logger.error(f"Error generating AI field descriptions: {e}")
-            for f in fields:
-                f.description = BankingIntelligence.get_enhanced_field_fallback(
-                    f.fieldName, f.dataType, source_name, table_name
-                )
-                f.description = _clean_text(f.description, FIELD_DESC_LIMIT)
-            return fields
+            # A failed call (timeout, rate limit, unparseable reply) gets fallbacks that are neither
+            # cached nor shared through `known`, so the next import of this table asks again
+            logger.error(f"Error generating AI descriptions: {e}")
+            return (
+                get_enhanced_table_fallback(table_name, source_name, fields),
+                _fallback_field_descriptions(table_name, source_name, fields),
+            )
+
+        # Anything missing or unusable in the response falls back per table / per field
+        if not isinstance(data, dict):
+            data = {}
+        field_map = data.get("fields") if isinstance(data.get("fields"), dict) else {}
+
+        table_description = _finish_table_description(
+            data.get("description"), table_name, source_name, fields, schema_key
+        )
+        fields = _finish_field_descriptions(field_map, table_name, source_name, fields, schema_key, known)
+        return table_description, fields
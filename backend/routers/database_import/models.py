@@ -2,6 +2,8 @@
 Pydantic models for database import functionality
 """
 
+import sys
+from functools import cached_property
 from pydantic import BaseModel
 from typing import List, Optional
 
@@ -27,6 +29,11 @@ class TableField(BaseModel):
     defaultValue: Optional[str] = None
     description: Optional[str] = None
 
+    @cached_property
+    def fieldNameUpper(self) -> str:
+        """Upper-cased field name, computed once per field (not serialized)"""
+        return sys.intern(self.fieldName.upper())
+
 class SchemaRequest(DatabaseConfig):
     tableName: str
 
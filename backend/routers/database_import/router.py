@@ -3,6 +3,7 @@ Database import router with clean separation of concerns
 """
 
 from fastapi import APIRouter, HTTPException
+from typing import Any, Dict, List
 import logging
 
 from .models import DatabaseConfig, SchemaRequest, DescribeFieldsRequest, TableField
@@ -14,8 +15,20 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+def build_table_fields(table_name: str, fields: List[Dict[str, Any]]) -> List[TableField]:
+    """Convert a connection handler's column rows into TableField objects (no AI descriptions)"""
+    return [TableField(
+        tableName=table_name,
+        fieldName=field["fieldName"],
+        dataType=field["dataType"],
+        isNullable=field["isNullable"],
+        isPrimaryKey=field["isPrimaryKey"],
+        isForeignKey=field["isForeignKey"],
+        defaultValue=field["defaultValue"]
+    ) for field in fields]
+
 @router.post("/connect")
-async def connect_database(config: DatabaseConfig):
+def connect_database(config: DatabaseConfig):
     """Connect to database and retrieve table list"""
     try:
         logger.info(f"Attempting to connect to {config.type} database at {config.server}")
@@ -23,7 +36,7 @@ async def connect_database(config: DatabaseConfig):
         
         # Get the appropriate connection handler
         connection_class = get_connection_handler(config.type)
-        handler = connection_class(config.dict())
+        handler = connection_class(config.model_dump())
 
         with handler:
             tables = handler.get_tables()
@@ -63,34 +76,26 @@ async def connect_database(config: DatabaseConfig):
         )
 
 @router.post("/schema")
-async def get_schema(request: SchemaRequest):
+def get_schema(request: SchemaRequest):
     """Get table schema without AI descriptions (AI generation handled by worker)"""
     try:
         logger.info(f"Getting schema for table {request.tableName}")
 
         # Get the appropriate connection handler
         connection_class = get_connection_handler(request.type)
-        handler = connection_class(request.dict())
+        handler = connection_class(request.model_dump())
 
         with handler:
             # Get table schema
             fields = handler.get_table_schema(request.tableName)
             logger.debug(f"Retrieved {len(fields)} fields for table {request.tableName}")
 
+            logger.info(f"Successfully retrieved schema for table {request.tableName} with {len(fields)} fields")
             # Convert to TableField objects (no AI descriptions yet)
-            table_fields = [TableField(
-                tableName=request.tableName,
-                fieldName=field["fieldName"],
-                dataType=field["dataType"],
-                isNullable=field["isNullable"],
-                isPrimaryKey=field["isPrimaryKey"],
-                isForeignKey=field["isForeignKey"],
-                defaultValue=field["defaultValue"]
-            ) for field in fields]
+            table_fields = build_table_fields(request.tableName, fields)
 
-            logger.info(f"Successfully retrieved schema for table {request.tableName} with {len(fields)} fields")
             return {
-                "fields": [field.dict() for field in table_fields],
+                "fields": [field.model_dump() for field in table_fields],
                 "table_description": f"Stores {request.tableName} data"  # Placeholder
             }
 
@@ -105,7 +110,7 @@ async def get_schema(request: SchemaRequest):
         )
 
 @router.post("/describe")
-async def describe_fields(request: DescribeFieldsRequest):
+def describe_fields(request: DescribeFieldsRequest):
     """Generate descriptions for existing fields"""
     try:
         table_name = request.tableName
@@ -124,7 +129,7 @@ async def describe_fields(request: DescribeFieldsRequest):
             table_name, fields, source_name, source_description
         )
         
-        return {"fields": [field.dict() for field in fields_with_descriptions]}
+        return {"fields": [field.model_dump() for field in fields_with_descriptions]}
     
     except HTTPException:
         raise
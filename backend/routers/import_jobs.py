@@ -1,15 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import case, func, update as sql_update
 from sqlalchemy.orm import Session
-from pydantic import BaseModel, UUID4
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, UUID4, field_validator
+from typing import Any, Dict, Optional, List
 from datetime import datetime, timedelta
-import json
 import uuid
 from database import get_db
 from models import ImportJob
 
 router = APIRouter()
 
+JOB_COLUMNS = (
+    ImportJob.id, ImportJob.user_id, ImportJob.config, ImportJob.status,
+    ImportJob.total_tables, ImportJob.imported_tables, ImportJob.failed_tables,
+    ImportJob.error_message, ImportJob.database_id,
+    ImportJob.created_at, ImportJob.updated_at, ImportJob.completed_at,
+)
+
 class ImportJobCreate(BaseModel):
     user_id: str
     config: dict
@@ -23,13 +30,43 @@ class ImportJobUpdate(BaseModel):
     database_id: Optional[UUID4] = None
     completed_at: Optional[datetime] = None
 
-@router.post("/import-jobs")
+class ImportJobResponse(BaseModel):
+    """API shape of an import job, read straight from an ImportJob instance or a JOB_COLUMNS row"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    user_id: str
+    config: Dict[str, Any]
+    status: str
+    total_tables: Optional[int] = None
+    imported_tables: Optional[int] = None
+    failed_tables: List[str] = []
+    error_message: Optional[str] = None
+    database_id: Optional[uuid.UUID] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    @field_validator('failed_tables', mode='before')
+    @classmethod
+    def _no_failures_as_empty_list(cls, value):
+        return value or []
+
+def job_etag(job: ImportJob) -> str:
+    """Weak validator for a job's current state (polled by the frontend while importing)"""
+    updated = job.updated_at.isoformat() if job.updated_at else ""
+    return f'W/"{job.status}-{job.imported_tables}-{updated}"'
+
+# Responses go through ImportJobResponse so FastAPI serializes them to JSON bytes in
+# pydantic-core directly, without building or jsonable_encoder-ing an intermediate dict.
+
+@router.post("/import-jobs", response_model=ImportJobResponse)
 def create_import_job(job: ImportJobCreate, db: Session = Depends(get_db)):
     try:
         db_job = ImportJob(
             id=uuid.uuid4(),
             user_id=job.user_id,
-            config=json.dumps(job.config),
+            config=job.config,
             status='pending',
             total_tables=job.total_tables,
             imported_tables=0
@@ -38,117 +75,72 @@ def create_import_job(job: ImportJobCreate, db: Session = Depends(get_db)):
         db.commit()
         db.refresh(db_job)
 
-        return {
-            "id": str(db_job.id),
-            "user_id": db_job.user_id,
-            "config": json.loads(db_job.config),
-            "status": db_job.status,
-            "total_tables": db_job.total_tables,
-            "imported_tables": db_job.imported_tables,
-            "failed_tables": json.loads(db_job.failed_tables) if db_job.failed_tables else [],
-            "error_message": db_job.error_message,
-            "database_id": str(db_job.database_id) if db_job.database_id else None,
-            "created_at": db_job.created_at.isoformat() if db_job.created_at else None,
-            "updated_at": db_job.updated_at.isoformat() if db_job.updated_at else None,
-            "completed_at": db_job.completed_at.isoformat() if db_job.completed_at else None
-        }
+        return db_job
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/import-jobs/{job_id}")
-def get_import_job(job_id: UUID4, db: Session = Depends(get_db)):
+@router.get("/import-jobs/{job_id}", response_model=ImportJobResponse)
+def get_import_job(job_id: UUID4, request: Request, response: Response, db: Session = Depends(get_db)):
     try:
-        job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+        job = db.get(ImportJob, job_id)
         if not job:
             raise HTTPException(status_code=404, detail="Import job not found")
 
-        return {
-            "id": str(job.id),
-            "user_id": job.user_id,
-            "config": json.loads(job.config),
-            "status": job.status,
-            "total_tables": job.total_tables,
-            "imported_tables": job.imported_tables,
-            "failed_tables": json.loads(job.failed_tables) if job.failed_tables else [],
-            "error_message": job.error_message,
-            "database_id": str(job.database_id) if job.database_id else None,
-            "created_at": job.created_at.isoformat() if job.created_at else None,
-            "updated_at": job.updated_at.isoformat() if job.updated_at else None,
-            "completed_at": job.completed_at.isoformat() if job.completed_at else None
-        }
+        # Every job write bumps updated_at, so polls for an unchanged job revalidate
+        # against the browser cache with a 304 instead of re-sending the job
+        etag = job_etag(job)
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+
+        return job
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/import-jobs/user/{user_id}")
-def get_user_import_jobs(user_id: str, status: Optional[str] = None, db: Session = Depends(get_db)):
+@router.get("/import-jobs/user/{user_id}", response_model=List[ImportJobResponse])
+def get_user_import_jobs(
+    user_id: str,
+    status: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
     try:
-        query = db.query(ImportJob).filter(ImportJob.user_id == user_id)
+        # Column-only query: rows are plain tuples, no ORM instances or identity map
+        query = db.query(*JOB_COLUMNS).filter(ImportJob.user_id == user_id)
 
         if status:
             statuses = status.split(',')
             query = query.filter(ImportJob.status.in_(statuses))
 
-        jobs = query.order_by(ImportJob.created_at.desc()).all()
-
-        return [{
-            "id": str(job.id),
-            "user_id": job.user_id,
-            "config": json.loads(job.config),
-            "status": job.status,
-            "total_tables": job.total_tables,
-            "imported_tables": job.imported_tables,
-            "failed_tables": json.loads(job.failed_tables) if job.failed_tables else [],
-            "error_message": job.error_message,
-            "database_id": str(job.database_id) if job.database_id else None,
-            "created_at": job.created_at.isoformat() if job.created_at else None,
-            "updated_at": job.updated_at.isoformat() if job.updated_at else None,
-            "completed_at": job.completed_at.isoformat() if job.completed_at else None
-        } for job in jobs]
+        # Newest first, one page at a time (ix_import_jobs_user_created serves both the filter and the order)
+        jobs = query.order_by(ImportJob.created_at.desc()).offset(offset).limit(limit).all()
+
+        return jobs
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.put("/import-jobs/{job_id}")
+@router.put("/import-jobs/{job_id}", response_model=ImportJobResponse)
 def update_import_job(job_id: UUID4, update: ImportJobUpdate, db: Session = Depends(get_db)):
     try:
-        job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+        # Single UPDATE ... OUTPUT round trip: only the provided fields are changed
+        values = update.model_dump(exclude_none=True)
+        job = db.execute(
+            sql_update(ImportJob)
+            .where(ImportJob.id == job_id)
+            .values(**values, updated_at=datetime.utcnow())
+            .returning(*JOB_COLUMNS)
+        ).first()
         if not job:
             raise HTTPException(status_code=404, detail="Import job not found")
 
-        if update.status is not None:
-            job.status = update.status
-        if update.imported_tables is not None:
-            job.imported_tables = update.imported_tables
-        if update.failed_tables is not None:
-            job.failed_tables = json.dumps(update.failed_tables)
-        if update.error_message is not None:
-            job.error_message = update.error_message
-        if update.database_id is not None:
-            job.database_id = update.database_id
-        if update.completed_at is not None:
-            job.completed_at = update.completed_at
-
-        job.updated_at = datetime.utcnow()
-
         db.commit()
-        db.refresh(job)
 
-        return {
-            "id": str(job.id),
-            "user_id": job.user_id,
-            "config": json.loads(job.config),
-            "status": job.status,
-            "total_tables": job.total_tables,
-            "imported_tables": job.imported_tables,
-            "failed_tables": json.loads(job.failed_tables) if job.failed_tables else [],
-            "error_message": job.error_message,
-            "database_id": str(job.database_id) if job.database_id else None,
-            "created_at": job.created_at.isoformat() if job.created_at else None,
-            "updated_at": job.updated_at.isoformat() if job.updated_at else None,
-            "completed_at": job.completed_at.isoformat() if job.completed_at else None
-        }
+        return job
     except HTTPException:
         raise
     except Exception as e:
@@ -156,26 +148,19 @@ def update_import_job(job_id: UUID4, update: ImportJobUpdate, db: Session = Depe
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/import-jobs/{job_id}/process")
-async def process_import_job(job_id: UUID4, config: dict, selected_tables: List[str], user_info: dict = None, db: Session = Depends(get_db)):
+def process_import_job(job_id: UUID4, config: dict, selected_tables: List[str], user_info: dict = None, db: Session = Depends(get_db)):
     """Queue an import job for processing by the worker"""
     try:
         # Validate that we have tables to import
         if not selected_tables or len(selected_tables) == 0:
             raise HTTPException(status_code=400, detail="No tables selected for import. Please select at least one table.")
 
-        job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+        job = db.get(ImportJob, job_id)
         if not job:
             raise HTTPException(status_code=404, detail="Import job not found")
 
-        # Parse existing config if it's a string, then merge with new data
-        if isinstance(job.config, str):
-            existing_config = json.loads(job.config)
-        else:
-            existing_config = job.config if job.config else {}
-
-        # Store config with selected tables for worker (as JSON string)
-        config_data = {**existing_config, **config, 'selected_tables': json.dumps(selected_tables)}
-        job.config = json.dumps(config_data)
+        # Merge new data into the existing config and store selected tables for worker
+        job.config = {**(job.config or {}), **config, 'selected_tables': selected_tables}
         job.status = 'pending'
         job.updated_at = datetime.utcnow()
         db.commit()
@@ -191,45 +176,55 @@ async def process_import_job(job_id: UUID4, config: dict, selected_tables: List[
 def get_worker_diagnostics(db: Session = Depends(get_db)):
     """Check if the import worker is likely running by checking for stale pending jobs"""
     try:
-        # Get all pending and in_progress jobs
-        pending_jobs = db.query(ImportJob).filter(
-            ImportJob.status.in_(['pending', 'in_progress'])
-        ).order_by(ImportJob.created_at.desc()).all()
-        
-        # Check for jobs that haven't been updated in a while (likely worker not running)
         now = datetime.utcnow()
         stale_threshold = timedelta(hours=2)
-        stale_jobs = []
-        recent_jobs = []
-        
-        for job in pending_jobs:
-            time_since_update = now - (job.updated_at if job.updated_at else job.created_at)
-            if time_since_update > stale_threshold:
-                stale_jobs.append({
-                    "id": str(job.id),
-                    "status": job.status,
-                    "created_at": job.created_at.isoformat() if job.created_at else None,
-                    "updated_at": job.updated_at.isoformat() if job.updated_at else None,
-                    "hours_since_update": round(time_since_update.total_seconds() / 3600, 2)
-                })
-            else:
-                recent_jobs.append({
+        stale_before = now - stale_threshold
+
+        # Pending and in_progress jobs (seeks ix_import_jobs_active on status), split on whether they have
+        # been updated (or created, if never updated) within the threshold
+        last_update = func.coalesce(ImportJob.updated_at, ImportJob.created_at)
+        active = ImportJob.status.in_(['pending', 'in_progress'])
+        is_stale = last_update < stale_before
+
+        stale_count, recent_count = db.query(
+            func.count(case((is_stale, 1))),
+            func.count(case((~is_stale, 1)))
+        ).filter(active).one()
+
+        # Only the 5 most recent jobs of each kind are shown
+        def job_summaries(condition, stale=False):
+            jobs = db.query(ImportJob.id, ImportJob.status, ImportJob.created_at, ImportJob.updated_at)\
+                .filter(active, condition)\
+                .order_by(ImportJob.created_at.desc())\
+                .limit(5).all()
+            summaries = []
+            for job in jobs:
+                summary = {
                     "id": str(job.id),
                     "status": job.status,
                     "created_at": job.created_at.isoformat() if job.created_at else None,
                     "updated_at": job.updated_at.isoformat() if job.updated_at else None,
-                })
-        
+                }
+                if stale:
+                    time_since_update = now - (job.updated_at if job.updated_at else job.created_at)
+                    summary["hours_since_update"] = round(time_since_update.total_seconds() / 3600, 2)
+                summaries.append(summary)
+            return summaries
+
+        # Sample rows are only fetched for buckets that have any
+        stale_jobs = job_summaries(is_stale, stale=True) if stale_count else []
+        recent_jobs = job_summaries(~is_stale) if recent_count else []
+
         # Determine worker status
-        worker_likely_running = len(stale_jobs) == 0 and len(recent_jobs) > 0
+        worker_likely_running = stale_count == 0 and recent_count > 0
         worker_status = "unknown"
         recommendations = []
         
-        if len(stale_jobs) > 0:
+        if stale_count > 0:
             worker_status = "likely_not_running"
             recommendations.append("The import worker process may not be running. Check if 'python backend/import_worker.py' is running.")
-            recommendations.append(f"Found {len(stale_jobs)} job(s) that haven't been updated in over 2 hours.")
-        elif len(recent_jobs) > 0:
+            recommendations.append(f"Found {stale_count} job(s) that haven't been updated in over 2 hours.")
+        elif recent_count > 0:
             worker_status = "likely_running"
             recommendations.append("Worker appears to be processing jobs.")
         else:
@@ -238,10 +233,10 @@ def get_worker_diagnostics(db: Session = Depends(get_db)):
         
         return {
             "worker_status": worker_status,
-            "stale_jobs_count": len(stale_jobs),
-            "recent_jobs_count": len(recent_jobs),
-            "stale_jobs": stale_jobs[:5],  # Limit to 5 most recent
-            "recent_jobs": recent_jobs[:5],
+            "stale_jobs_count": stale_count,
+            "recent_jobs_count": recent_count,
+            "stale_jobs": stale_jobs,
+            "recent_jobs": recent_jobs,
             "recommendations": recommendations,
             "check_timestamp": now.isoformat()
         }
@@ -1,8 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, text
-from typing import List, Optional, Union
+from sqlalchemy import or_, and_, text, update, select, union_all, literal_column, cast, null, func
+from typing import Dict, List, Optional, Union
+import json
 import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from openai import OpenAI
 import numpy as np
 from pydantic import BaseModel
@@ -30,6 +37,7 @@ class SearchRequest(BaseModel):
     source_filter: Optional[str] = None
     database_filter: Optional[str] = None
     min_score: Optional[float] = 0.7
+    limit: Optional[int] = 100  # best hits returned; None or 0 returns them all
 
 class TableResult(BaseModel):
     type: str = "table"
@@ -56,219 +64,376 @@ class SearchResponse(BaseModel):
     total: int
     results: List[TableResult | FieldResult]
 
-def get_embedding(text: str) -> List[float]:
-    """Get embedding for text using OpenAI's API"""
+# Chat model for query interpretation and candidate ranking, answered in JSON mode
+CHAT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+# OpenAI embeddings model and the most inputs it accepts in one request
+EMBEDDING_MODEL = "text-embedding-ada-002"
+EMBEDDING_BATCH_SIZE = 2048
+# Embeddings requests in flight at once when a call spans several batches
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+
+# Embeddings are stored on tables/fields as raw float32 bytes (VARBINARY)
+EMBEDDING_DIMENSIONS = 1536
+EMBEDDING_BYTES = EMBEDDING_DIMENSIONS * np.dtype(np.float32).itemsize
+
+def table_embedding_text(name: str, description: Optional[str]) -> str:
+    """Text embedded for a table (stored embeddings are recomputed when this changes)"""
+    return f"{name} {description or ''}"
+
+def field_embedding_text(name: str, description: Optional[str], data_type: str, table_name: str) -> str:
+    """Text embedded for a field (stored embeddings are recomputed when this changes)"""
+    return f"{name} {description or ''} {data_type} {table_name}"
+
+def embedding_to_bytes(embedding: np.ndarray) -> bytes:
+    return np.asarray(embedding, dtype=np.float32).tobytes()
+
+def embedding_from_bytes(value: Optional[bytes]) -> Optional[np.ndarray]:
+    """A stored embedding, or None if it is missing or not in the float32 format"""
+    if value is None or len(value) != EMBEDDING_BYTES:
+        return None
+    return np.frombuffer(value, dtype=np.float32)
+
+def embed_batch(texts: List[str]) -> List[List[float]]:
+    """One embeddings request for up to EMBEDDING_BATCH_SIZE texts, in input order"""
+    response = client.embeddings.create(model=EMBEDDING_MODEL, input=texts)
+    return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+def get_embeddings(texts: List[str]) -> np.ndarray:
+    """Get embeddings for many texts using OpenAI's API (one request per 2048 texts), one row per text"""
     try:
-        response = client.embeddings.create(
-            model="text-embedding-ada-002",
-            input=text
-        )
-        return response.data[0].embedding
+        batches = [texts[start:start + EMBEDDING_BATCH_SIZE] for start in range(0, len(texts), EMBEDDING_BATCH_SIZE)]
+        if len(batches) > 1:
+            # Overlap the requests' network latency, a few at a time to stay within rate limits
+            with ThreadPoolExecutor(max_workers=min(EMBEDDING_CONCURRENCY, len(batches))) as executor:
+                results = list(executor.map(embed_batch, batches))
+        else:
+            results = [embed_batch(batch) for batch in batches]
+        return np.array([embedding for result in results for embedding in result], dtype=np.float32)
     except Exception as e:
-        logger.error(f"Error getting embedding: {str(e)}")
+        logger.error(f"Error getting embeddings: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to generate embedding")
 
-def cosine_similarity(embedding1: List[float], embedding2: List[float]) -> float:
-    """Calculate cosine similarity between two embeddings"""
-    a = np.array(embedding1)
-    b = np.array(embedding2)
-    return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
-
-def semantic_search_with_openai(query: str, items: List[dict], item_type: str) -> List[dict]:
-    """Use OpenAI to perform semantic search and scoring"""
-    try:
-        # Create a prompt for OpenAI to analyze and score items
-        items_text = "\n".join([
-            f"{i+1}. {item['name']}: {item.get('description', 'No description')}"
-            for i, item in enumerate(items)
-        ])
-        
-        prompt = f"""You are analyzing a data dictionary search query. 
-
-Query: "{query}"
-
-Available {item_type}s:
-{items_text}
-
-Based on the search query, analyze which {item_type}s are most relevant. Consider:
-- Direct name matches
-- Semantic meaning and context
-- Business domain relevance
-- Functional relationships
-
-Return a JSON array with objects containing:
-- "index": the item number (1-based)
-- "score": relevance score from 0.0 to 1.0
-- "reason": brief explanation of relevance
-
-Only include items with score >= 0.3. Sort by score descending.
-
-IMPORTANT: Return ONLY the JSON array, no other text or formatting. Example:
-[
-  {"index": 6, "score": 1.0, "reason": "Exact match for RECID field"},
-  {"index": 2, "score": 0.8, "reason": "Related record status field"}
-]"""
-
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a data dictionary search expert. Analyze queries and match them to database objects based on semantic meaning, not just keyword matching."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=2000,
-            temperature=0.1
-        )
-        
-        # Parse the response
-        import json
+# Search queries are embedded by a few worker threads. A free worker takes every query waiting
+# at that moment (up to QUERY_BATCH_SIZE) and embeds them in one request, so a lone query goes
+# out at once and only queries that would otherwise wait for a busy worker share a request.
+# The workers start with the first query, not on import (the import worker and scripts never need them)
+QUERY_EMBEDDING_WORKERS = int(os.getenv("QUERY_EMBEDDING_WORKERS", "4"))
+QUERY_BATCH_SIZE = 64
+_pending_queries: "queue.Queue[tuple]" = queue.Queue()
+_query_workers_started = False
+_query_workers_lock = threading.Lock()
+
+def embed_pending_queries():
+    while True:
+        batch = [_pending_queries.get()]
+        while len(batch) < QUERY_BATCH_SIZE:
+            try:
+                batch.append(_pending_queries.get_nowait())
+            except queue.Empty:
+                break
         try:
-            response_content = response.choices[0].message.content.strip()
-            logger.debug(f"OpenAI response content: {response_content}")
-            
-            # Try to extract JSON from the response if it's wrapped in markdown or other text
-            if "```json" in response_content:
-                # Extract JSON from markdown code block
-                start = response_content.find("```json") + 7
-                end = response_content.find("```", start)
-                json_str = response_content[start:end].strip()
-            elif response_content.startswith('[') or response_content.startswith('{'):
-                # Response is already JSON
-                json_str = response_content
-            else:
-                # Try to find JSON array in the response
-                import re
-                json_match = re.search(r'\[.*\]', response_content, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(0)
-                else:
-                    logger.error(f"Could not extract JSON from OpenAI response: {response_content}")
-                    return []
-            
-            scores = json.loads(json_str)
-            
-            # Apply scores to items
-            scored_items = []
-            for score_item in scores:
-                index = score_item["index"] - 1  # Convert to 0-based
-                if 0 <= index < len(items):
-                    item = items[index].copy()
-                    item["score"] = score_item["score"]
-                    item["reason"] = score_item.get("reason", "")
-                    scored_items.append(item)
-            
-            return sorted(scored_items, key=lambda x: x["score"], reverse=True)
-            
-        except json.JSONDecodeError:
-            logger.error(f"Failed to parse OpenAI response as JSON. Content: {response.choices[0].message.content}")
-            # Fallback to simple keyword matching
-            return fallback_keyword_search(query, items, item_type)
+            embeddings = get_embeddings([query for query, _ in batch])
         except Exception as e:
-            logger.error(f"Error processing OpenAI response: {str(e)}")
-            return []
-            
+            for _, future in batch:
+                future.set_exception(e)
+            continue
+        for (_, future), embedding in zip(batch, embeddings):
+            future.set_result(embedding.copy())
+
+def start_query_workers():
+    global _query_workers_started
+    with _query_workers_lock:
+        if not _query_workers_started:
+            for _ in range(QUERY_EMBEDDING_WORKERS):
+                threading.Thread(target=embed_pending_queries, name="query-embedding", daemon=True).start()
+            _query_workers_started = True
+
+@lru_cache(maxsize=1024)
+def embed_query(query: str) -> np.ndarray:
+    """Embedding of a search query; repeated queries are answered from memory (read-only array)"""
+    start_query_workers()
+    future = Future()
+    _pending_queries.put((query, future))
+    embedding = future.result()
+    embedding.setflags(write=False)
+    return embedding
+
+@lru_cache(maxsize=256)
+def chat_completion(system_prompt: str, prompt: str, max_tokens: int) -> str:
+    """JSON object replying to a prompt; an identical prompt (same query and candidates) is answered from memory"""
+    response = client.chat.completions.create(
+        model=CHAT_MODEL,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=max_tokens,
+        temperature=0.1,
+        response_format={"type": "json_object"}
+    )
+    return response.choices[0].message.content
+
+def unit_vector(embedding: np.ndarray, dtype=np.float32) -> np.ndarray:
+    """Embedding scaled to length 1, so cosine similarity is a plain dot product"""
+    return (embedding / np.sqrt(np.dot(embedding, embedding))).astype(dtype)
+
+# Threads that run a search's OpenAI calls alongside the request's database work
+openai_calls = ThreadPoolExecutor(max_workers=8, thread_name_prefix="search-openai")
+
+def cosine_similarities(query: np.ndarray, unit_embeddings: np.ndarray) -> np.ndarray:
+    """Cosine similarity of a query against rows that are already unit length (float16 rows are upcast once, one GEMV)"""
+    return unit_embeddings.astype(np.float32, copy=False) @ unit_vector(query)
+
+def store_embeddings(db: Session, rows: List[tuple], embeddings: np.ndarray):
+    """Persist embeddings computed at search time for (model, id) rows, so later searches reuse them"""
+    try:
+        for model in (Table, Field):
+            values = [
+                {"id": row_id, "embedding": embedding_to_bytes(embedding)}
+                for (row_model, row_id), embedding in zip(rows, embeddings) if row_model is model
+            ]
+            if values:
+                db.execute(update(model), values)
+        db.commit()
     except Exception as e:
-        logger.error(f"Error in semantic search: {str(e)}")
+        # Not fatal: the rows are simply embedded again by the next search
+        db.rollback()
+        logger.warning(f"Could not store embeddings: {str(e)}")
+
+# Candidate embeddings kept in memory between searches, keyed by (kind, id, embedded text) so a
+# row whose text has changed since (and whose stored embedding was cleared) is simply a miss.
+# Entries are unit-length float16 (3 KB each; cosine ranks are unaffected at this precision)
+EMBEDDING_CACHE_SIZE = int(os.getenv("SEARCH_EMBEDDING_CACHE_SIZE", "40000"))
+_embedding_cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
+def cached_embeddings(keys: List[tuple]) -> List[Optional[np.ndarray]]:
+    with _embedding_cache_lock:
+        embeddings = []
+        for key in keys:
+            embedding = _embedding_cache.get(key)
+            if embedding is not None:
+                _embedding_cache.move_to_end(key)
+            embeddings.append(embedding)
+        return embeddings
+
+def cache_embeddings(keys: List[tuple], embeddings: List[np.ndarray]):
+    with _embedding_cache_lock:
+        for key, embedding in zip(keys, embeddings):
+            _embedding_cache[key] = embedding
+            _embedding_cache.move_to_end(key)
+        while len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+            _embedding_cache.popitem(last=False)
+
+def load_embeddings(db: Session, candidates: list) -> dict:
+    """Stored embeddings of search candidates by (kind, id), read in chunks under SQL Server's parameter limit"""
+    stored = {}
+    for kind, model in (('table', Table), ('field', Field)):
+        ids = [candidate.id for candidate in candidates if candidate.kind == kind]
+        for start in range(0, len(ids), 1000):
+            rows = db.query(model.id, model.embedding).filter(model.id.in_(ids[start:start + 1000]))
+            stored.update(((kind, row_id), embedding) for row_id, embedding in rows)
+    return stored
+
+def contains_pattern(text: str) -> str:
+    """LIKE pattern matching `text` anywhere, its wildcards (% _ and SQL Server's [) escaped with backslash"""
+    for char in ('\\', '%', '_', '['):
+        text = text.replace(char, '\\' + char)
+    return f"%{text}%"
 
 @router.post("/search", response_model=SearchResponse)
-
-def fallback_keyword_search(query: str, items: List[dict], item_type: str) -> List[dict]:
-    """Fallback keyword-based search when OpenAI fails"""
+def search(request: SearchRequest, db: Session = Depends(get_db)):
+    """Semantic search over tables and fields, scored by embedding similarity to the query"""
     try:
-        query_lower = query.lower()
-        query_words = query_lower.split()
-        
-        scored_items = []
-        for item in items:
-            score = 0.0
-            name_lower = item['name'].lower()
-            desc_lower = (item.get('description') or '').lower()
-            
-            # Exact name match gets highest score
-            if query_lower == name_lower:
-                score = 1.0
-            # Name contains query gets high score
-            elif query_lower in name_lower:
-                score = 0.9
-            # Query words in name
-            elif any(word in name_lower for word in query_words):
-                score = 0.8
-            # Query in description
-            elif query_lower in desc_lower:
-                score = 0.7
-            # Query words in description
-            elif any(word in desc_lower for word in query_words):
-                score = 0.6
-            
-            if score >= 0.3:
-                item_copy = item.copy()
-                item_copy["score"] = score
-                item_copy["reason"] = f"Keyword match in {item_type} name/description"
-                scored_items.append(item_copy)
-        
-        return sorted(scored_items, key=lambda x: x["score"], reverse=True)
-        
-    except Exception as e:
-        logger.error(f"Error in fallback search: {str(e)}")
-        return []
+        def narrowed(statement):
+            """Apply the request's source/database filters. Every row they leave is a candidate:
+            ranking is by embedding alone, so rows that share no word with the query still match"""
+            if request.source_filter:
+                statement = statement.where(SourceSystem.name == request.source_filter)
+            if request.database_filter:
+                statement = statement.where(Database.name == request.database_filter)
+            return statement
+
+        # Table and field candidates come back from one UNION ALL query, told apart by kind
+        branches = []
+        if request.type_filter in (None, 'table'):
+            branches.append(narrowed(select(
+                literal_column("'table'").label('kind'),
+                Table.id.label('id'),
+                Table.name.label('name'),
+                Table.description.label('description'),
+                cast(null(), Field.type.type).label('type'),
+                Table.name.label('table_name'),
+                Database.name.label('database_name'),
+                SourceSystem.name.label('source_name')
+            ).join(Database, Table.database_id == Database.id)
+             .join(SourceSystem, Database.source_id == SourceSystem.id)))
+        if request.type_filter in (None, 'field'):
+            branches.append(narrowed(select(
+                literal_column("'field'").label('kind'),
+                Field.id.label('id'),
+                Field.name.label('name'),
+                Field.description.label('description'),
+                Field.type.label('type'),
+                Table.name.label('table_name'),
+                Database.name.label('database_name'),
+                SourceSystem.name.label('source_name')
+            ).join(Table, Field.table_id == Table.id)
+             .join(Database, Table.database_id == Database.id)
+             .join(SourceSystem, Database.source_id == SourceSystem.id)))
+
+        def result(candidate, score: float) -> Union[TableResult, FieldResult]:
+            """Response model for a candidate row; its values come typed from our own query,
+            so it is constructed without re-running validation"""
+            if candidate.kind == 'table':
+                return TableResult.model_construct(
+                    id=str(candidate.id),
+                    name=candidate.name,
+                    description=candidate.description,
+                    databaseName=candidate.database_name,
+                    sourceName=candidate.source_name,
+                    score=score
+                )
+            return FieldResult.model_construct(
+                id=str(candidate.id),
+                name=candidate.name,
+                description=candidate.description,
+                tableName=candidate.table_name,
+                databaseName=candidate.database_name,
+                sourceName=candidate.source_name,
+                dataType=candidate.type,
+                score=score
+            )
 
+        if not branches:
+            return SearchResponse(query=request.query, total=0, results=[])
+
+        # A blank query only browses the filters: nothing to embed or score, so rows come back
+        # by name, each with a full score, along with the total number of matches
+        if not request.query.strip():
+            listing = union_all(*branches).subquery()
+            statement = select(listing, func.count().over().label('total'))\
+                .order_by(listing.c.name, listing.c.kind, listing.c.table_name)
+            if request.limit and request.limit > 0:
+                statement = statement.limit(request.limit)
+            rows = db.execute(statement).all()
+            return SearchResponse(
+                query=request.query,
+                total=rows[0].total if rows else 0,
+                results=[result(row, 1.0) for row in rows]
+            )
 
+        # The query's embedding (an OpenAI round trip unless cached) is fetched while the
+        # candidates are read and their embeddings looked up
+        query_embedding = openai_calls.submit(embed_query, request.query)
+
+        candidates = db.execute(union_all(*branches)).all()
+        if not candidates:
+            return SearchResponse(query=request.query, total=0, results=[])
+
+        texts = [
+            table_embedding_text(candidate.name, candidate.description) if candidate.kind == 'table'
+            else field_embedding_text(candidate.name, candidate.description, candidate.type, candidate.table_name)
+            for candidate in candidates
+        ]
+        keys = [(candidate.kind, candidate.id, text) for candidate, text in zip(candidates, texts)]
+
+        # Embeddings come from memory when possible, then from the stored column; rows with
+        # neither (not embedded yet, or cleared by an edit) are embedded in one batched request
+        embeddings = cached_embeddings(keys)
+        unknown = [i for i, embedding in enumerate(embeddings) if embedding is None]
+
+        if unknown:
+            stored = load_embeddings(db, [candidates[i] for i in unknown])
+            for i in unknown:
+                embeddings[i] = embedding_from_bytes(stored.get((candidates[i].kind, candidates[i].id)))
+
+            missing = [i for i in unknown if embeddings[i] is None]
+            if missing:
+                computed = get_embeddings([texts[i] for i in missing])
+                for i, embedding in zip(missing, computed):
+                    embeddings[i] = embedding
+
+                store_embeddings(db, [
+                    (Table if candidates[i].kind == 'table' else Field, candidates[i].id) for i in missing
+                ], computed)
+
+            for i in unknown:
+                embeddings[i] = unit_vector(embeddings[i], np.float16)
+            cache_embeddings([keys[i] for i in unknown], [embeddings[i] for i in unknown])
+
+        scores = cosine_similarities(query_embedding.result(), np.vstack(embeddings))
+
+        # Rows at or above min_score, best first, picked out in NumPy rather than a Python sort;
+        # beyond the limit only the best hits are partitioned out (O(N)) and sorted
+        hits = np.flatnonzero(scores >= (request.min_score or 0.0))
+        total = len(hits)
+        if request.limit and request.limit > 0 and total > request.limit:
+            hits = hits[np.argpartition(-scores[hits], request.limit - 1)[:request.limit]]
+        hits = hits[np.argsort(-scores[hits], kind='stable')]
+
+        results = [result(candidates[i], float(scores[i])) for i in hits.tolist()]
+
+        return SearchResponse(query=request.query, total=total, results=results)
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Search error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/search/suggestions")
-async def get_search_suggestions(
+@router.get("/search/suggestions", response_model=Dict[str, List[str]])
+def get_search_suggestions(
     prefix: str,
     db: Session = Depends(get_db)
 ):
     """Get search suggestions based on prefix"""
     try:
-        # Get matching table names
-        table_suggestions = db.query(Table.name)\
-            .filter(Table.name.ilike(f"%{prefix}%"))\
-            .limit(5)\
-            .all()
-            
-        # Get matching field names
-        field_suggestions = db.query(Field.name)\
-            .filter(Field.name.ilike(f"%{prefix}%"))\
-            .limit(5)\
-            .all()
-            
-        # Get matching categories
-        category_suggestions = db.query(Category.name)\
-            .filter(Category.name.ilike(f"%{prefix}%"))\
-            .limit(5)\
-            .all()
-            
-        return {
-            "tables": [t[0] for t in table_suggestions],
-            "fields": [f[0] for f in field_suggestions],
-            "categories": [c[0] for c in category_suggestions]
-        }
-        
+        # Up to 5 matching table, field and category names, fetched in one round trip
+        pattern = contains_pattern(prefix)
+        branches = [
+            select(literal_column(f"'{kind}'").label('kind'), column.label('name'))
+            .where(column.ilike(pattern, escape='\\'))
+            .limit(5)
+            .subquery()
+            for kind, column in (('tables', Table.name), ('fields', Field.name), ('categories', Category.name))
+        ]
+        suggestions = {"tables": [], "fields": [], "categories": []}
+        for kind, name in db.execute(union_all(*[select(branch) for branch in branches])):
+            suggestions[kind].append(name)
+
+        return suggestions
+
     except Exception as e:
         logger.error(f"Error getting search suggestions: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/search/filters")
-async def get_search_filters(db: Session = Depends(get_db)):
+FILTER_NAMES = union_all(
+    select(literal_column("'sources'").label('kind'), SourceSystem.name.label('name')).distinct(),
+    select(literal_column("'databases'"), Database.name).distinct(),
+    select(literal_column("'categories'"), Category.name).distinct()
+)
+
+# Filter options change only when sources, databases or categories are added or renamed, so a
+# listing is served from memory for this many seconds before it is read again
+SEARCH_FILTERS_TTL = float(os.getenv("SEARCH_FILTERS_TTL", "60"))
+_search_filters: Optional[tuple] = None  # (expiry on the monotonic clock, filters)
+
+@router.get("/search/filters", response_model=Dict[str, List[str]])
+def get_search_filters(db: Session = Depends(get_db)):
     """Get available search filters"""
+    global _search_filters
     try:
-        # Get unique source systems
-        sources = db.query(SourceSystem.name).distinct().all()
-
-        # Get unique databases
-        databases = db.query(Database.name).distinct().all()
+        if _search_filters is not None and _search_filters[0] > time.monotonic():
+            return _search_filters[1]
 
-        # Get unique categories
-        categories = db.query(Category.name).distinct().all()
+        # Unique source, database and category names in one round trip, tagged by kind
+        filters = {"sources": [], "databases": [], "categories": []}
+        for kind, name in db.execute(FILTER_NAMES):
+            filters[kind].append(name)
 
-        return {
-            "sources": [s[0] for s in sources],
-            "databases": [d[0] for d in databases],
-            "categories": [c[0] for c in categories]
-        }
+        _search_filters = (time.monotonic() + SEARCH_FILTERS_TTL, filters)
+        return filters
 
     except Exception as e:
         logger.error(f"Error getting search filters: {str(e)}")
@@ -300,22 +465,49 @@ class NaturalLanguageFieldResponse(BaseModel):
     total: int
     results: List[FieldMatch]
 
-@router.post("/search/natural-language-fields", response_model=NaturalLanguageFieldResponse)
-async def natural_language_field_search(
-    request: NaturalLanguageFieldRequest,
-    db: Session = Depends(get_db)
-):
-    """
-    Search for fields using natural language description.
-    Example: "I want a field for a customer legal document"
-    """
-    try:
-        import json
-
-        # First, interpret the query using OpenAI to extract precise intent
-        interpretation_prompt = f"""You are a database search expert analyzing a query for semantic field matching.
-
-User query: "{request.query}"
+# Natural-language field searches are answered from memory for a while when an earlier search with
+# the same filters and limit had a near-paraphrase query (cosine of the query embeddings at least
+# NL_SEARCH_CACHE_SIMILARITY; ada-002 puts unrelated text around 0.7-0.8, so the bar sits high),
+# skipping both GPT round trips
+NL_SEARCH_CACHE_SIMILARITY = float(os.getenv("NL_SEARCH_CACHE_SIMILARITY", "0.97"))
+NL_SEARCH_CACHE_TTL = float(os.getenv("NL_SEARCH_CACHE_TTL", "300"))
+NL_SEARCH_CACHE_SIZE = int(os.getenv("NL_SEARCH_CACHE_SIZE", "256"))
+# (scope, query) -> (unit query embedding, expiry on the monotonic clock, response)
+_nl_search_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_nl_search_cache_lock = threading.Lock()
+
+def cached_nl_search(scope: tuple, query_embedding: np.ndarray) -> Optional[NaturalLanguageFieldResponse]:
+    """Unexpired response of the most similar earlier query in the same scope, if similar enough"""
+    now = time.monotonic()
+    with _nl_search_cache_lock:
+        for key in [key for key, (_, expires, _) in _nl_search_cache.items() if expires <= now]:
+            del _nl_search_cache[key]
+
+        best_key, best_similarity = None, NL_SEARCH_CACHE_SIMILARITY
+        for key, (embedding, _, _) in _nl_search_cache.items():
+            if key[0] == scope:
+                similarity = float(embedding @ query_embedding)
+                if similarity >= best_similarity:
+                    best_key, best_similarity = key, similarity
+        if best_key is None:
+            return None
+
+        _nl_search_cache.move_to_end(best_key)
+        logger.info(f"Natural language search answered from cache (similarity {best_similarity:.3f} to '{best_key[1]}')")
+        return _nl_search_cache[best_key][2]
+
+def cache_nl_search(scope: tuple, query: str, query_embedding: np.ndarray, response: NaturalLanguageFieldResponse):
+    with _nl_search_cache_lock:
+        _nl_search_cache[(scope, query)] = (query_embedding, time.monotonic() + NL_SEARCH_CACHE_TTL, response)
+        _nl_search_cache.move_to_end((scope, query))
+        while len(_nl_search_cache) > NL_SEARCH_CACHE_SIZE:
+            _nl_search_cache.popitem(last=False)
+
+INTERPRETATION_SYSTEM_PROMPT = "You are a data dictionary search expert specializing in precise semantic analysis of database field queries. Focus on specificity over generality."
+MATCHING_SYSTEM_PROMPT = "You are a database field matching expert. Analyze queries and match them to database fields based on semantic meaning and business context."
+
+# Instructions for turning a natural-language query into search intent; the query itself is appended
+INTERPRETATION_PROMPT = """You are a database search expert analyzing a query for semantic field matching.
 
 Extract the PRECISE business concept and related terms:
 
@@ -327,7 +519,7 @@ Extract the PRECISE business concept and related terms:
 6. Secondary Entities: Related objects that might reference this indirectly
 
 Respond in JSON format:
-{{
+{
   "interpretation": "Precise business concept explanation",
   "core_concept": "exact_concept_name",
   "primary_keywords": ["specific_term1", "specific_term2"],
@@ -335,10 +527,10 @@ Respond in JSON format:
   "exclusion_keywords": ["generic_term1", "confusing_term1"],
   "primary_entities": ["EntityName1", "EntityName2"],
   "secondary_entities": ["RelatedEntity1"]
-}}
+}
 
 Example for "customer employment status":
-{{
+{
   "interpretation": "Customer's current employment classification and job status",
   "core_concept": "employment_status",
   "primary_keywords": ["employment", "employ", "job", "work", "occupation", "profession", "career"],
@@ -346,40 +538,42 @@ Example for "customer employment status":
   "exclusion_keywords": ["account_status", "loan_status", "application_status", "marital_status", "address_status"],
   "primary_entities": ["Customer", "Client", "Borrower", "Applicant"],
   "secondary_entities": ["Employment", "Income", "Occupation"]
-}}"""
-
-        interpretation_response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a data dictionary search expert specializing in precise semantic analysis of database field queries. Focus on specificity over generality."},
-                {"role": "user", "content": interpretation_prompt}
-            ],
-            max_tokens=500,
-            temperature=0.1
-        )
-
-        interpretation_text = interpretation_response.choices[0].message.content.strip()
-        if "```json" in interpretation_text:
-            start = interpretation_text.find("```json") + 7
-            end = interpretation_text.find("```", start)
-            interpretation_text = interpretation_text[start:end].strip()
-
-        interpretation_data = json.loads(interpretation_text)
-        interpretation = interpretation_data.get("interpretation", "Searching for relevant fields")
-        core_concept = interpretation_data.get("core_concept", "")
-        primary_keywords = interpretation_data.get("primary_keywords", [])
-        related_terms = interpretation_data.get("related_terms", [])
-        exclusion_keywords = [x.lower() for x in interpretation_data.get("exclusion_keywords", [])]
-        primary_entities = [x.lower() for x in interpretation_data.get("primary_entities", [])]
-        secondary_entities = [x.lower() for x in interpretation_data.get("secondary_entities", [])]
+}"""
 
-        # Combine for keyword matching
-        all_keywords = primary_keywords + related_terms
+@router.post("/search/natural-language-fields", response_model=NaturalLanguageFieldResponse)
+def natural_language_field_search(
+    request: NaturalLanguageFieldRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Search for fields using natural language description.
+    Example: "I want a field for a customer legal document"
+    """
+    try:
+        # The query's embedding (for the response cache) and its interpretation are requested
+        # together; the interpretation keeps running while the cache is checked and the fields read.
+        # The fixed instructions come first so every request shares the same prompt prefix
+        interpretation_prompt = f'{INTERPRETATION_PROMPT}\n\nUser query: "{request.query}"'
+        embedding_call = openai_calls.submit(embed_query, request.query)
+        interpretation_call = openai_calls.submit(
+            chat_completion,
+            INTERPRETATION_SYSTEM_PROMPT,
+            interpretation_prompt,
+            max_tokens=500
+        )
 
-        logger.info(f"Intent Analysis - Core: {core_concept}")
-        logger.info(f"Primary Keywords: {primary_keywords}")
-        logger.info(f"Exclusions: {exclusion_keywords}")
-        logger.info(f"Primary Entities: {primary_entities}")
+        # A recent search with a near-identical query and the same filters is reused as is; if the
+        # query can't be embedded the search simply runs uncached
+        scope = (request.source_filter, request.database_filter, request.limit)
+        try:
+            query_embedding = unit_vector(embedding_call.result())
+        except Exception:
+            query_embedding = None
+        if query_embedding is not None:
+            cached = cached_nl_search(scope, query_embedding)
+            if cached is not None:
+                interpretation_call.cancel()  # only stops it if it hasn't started yet
+                return cached.model_copy(update={"query": request.query})
 
         # Build query to get all fields with metadata
         query = db.query(
@@ -404,6 +598,24 @@ Example for "customer employment status":
 
         all_fields = query.all()
 
+        interpretation_text = interpretation_call.result()
+        interpretation_data = json.loads(interpretation_text)
+        interpretation = interpretation_data.get("interpretation", "Searching for relevant fields")
+        core_concept = interpretation_data.get("core_concept", "")
+        primary_keywords = interpretation_data.get("primary_keywords", [])
+        related_terms = interpretation_data.get("related_terms", [])
+        exclusion_keywords = [x.lower() for x in interpretation_data.get("exclusion_keywords", [])]
+        primary_entities = [x.lower() for x in interpretation_data.get("primary_entities", [])]
+        secondary_entities = [x.lower() for x in interpretation_data.get("secondary_entities", [])]
+
+        # Combine for keyword matching
+        all_keywords = primary_keywords + related_terms
+
+        logger.info(f"Intent Analysis - Core: {core_concept}")
+        logger.info(f"Primary Keywords: {primary_keywords}")
+        logger.info(f"Exclusions: {exclusion_keywords}")
+        logger.info(f"Primary Entities: {primary_entities}")
+
         if not all_fields:
             return NaturalLanguageFieldResponse(
                 query=request.query,
@@ -652,7 +864,7 @@ PENALIZE:
 - Fields from unrelated entities or schemas (-0.2 to score)
 - Description-only matches with no name relevance (-0.15 to score)
 
-Return a JSON array with objects containing:
+Return a JSON object whose "results" array holds objects containing:
 - "index": the field number (1-based)
 - "score": precision-adjusted relevance score from 0.0 to 1.0
 - "reason": explanation citing specific matches to core concept, keywords, and entity context (max 50 words)
@@ -660,47 +872,22 @@ Return a JSON array with objects containing:
 Only include fields with score >= 0.5 (stricter threshold). Sort by score descending. Return top {min(request.limit, 15)} matches.
 
 Example:
-[
+{{"results": [
   {{"index": 12, "score": 0.98, "reason": "Customer.EmploymentStatus - exact core concept match in primary entity table"}},
   {{"index": 5, "score": 0.88, "reason": "Customer.EmploymentType - contains 'employment' primary keyword in Customer entity"}},
   {{"index": 23, "score": 0.72, "reason": "Employment.CustomerID - links employment data to customer entity"}}
-]"""
-
-        matching_response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a database field matching expert. Analyze queries and match them to database fields based on semantic meaning and business context."},
-                {"role": "user", "content": matching_prompt}
-            ],
-            max_tokens=2000,
-            temperature=0.1
+]}}"""
+
+        response_content = chat_completion(
+            MATCHING_SYSTEM_PROMPT,
+            matching_prompt,
+            max_tokens=2000
         )
 
         # Parse the AI response
-        response_content = matching_response.choices[0].message.content.strip()
         logger.info(f"AI matching response: {response_content}")
 
-        if "```json" in response_content:
-            start = response_content.find("```json") + 7
-            end = response_content.find("```", start)
-            json_str = response_content[start:end].strip()
-        elif response_content.startswith('['):
-            json_str = response_content
-        else:
-            import re
-            json_match = re.search(r'\[.*\]', response_content, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-            else:
-                logger.error(f"Could not extract JSON from response: {response_content}")
-                return NaturalLanguageFieldResponse(
-                    query=request.query,
-                    interpretation=interpretation,
-                    total=0,
-                    results=[]
-                )
-
-        matches = json.loads(json_str)
+        matches = json.loads(response_content).get("results", [])
 
         # Build result list with metadata
         results = []
@@ -723,12 +910,15 @@ Example:
                     is_nullable=field_data['is_nullable']
                 ))
 
-        return NaturalLanguageFieldResponse(
+        response = NaturalLanguageFieldResponse(
             query=request.query,
             interpretation=interpretation,
             total=len(results),
             results=results
         )
+        if query_embedding is not None:
+            cache_nl_search(scope, request.query, query_embedding, response)
+        return response
 
     except json.JSONDecodeError as e:
         logger.error(f"Failed to parse JSON from AI response: {str(e)}")
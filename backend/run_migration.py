@@ -1,6 +1,9 @@
 """
-Script to apply the table stats migration
+Script to apply a SQL migration (defaults to the table stats migration)
+
+Usage: python run_migration.py [migration.sql]
 """
+import sys
 from database import engine
 from sqlalchemy import text
 import logging
@@ -8,20 +11,19 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def apply_migration():
-    with open('add_table_stats_columns.sql', 'r') as f:
-        sql = f.read()
+def apply_migration(path: str = 'add_table_stats_columns.sql'):
+    with open(path, 'r') as f:
+        # Drop comment lines so a statement preceded by a comment isn't skipped
+        sql = "".join(line for line in f if not line.lstrip().startswith('--'))
 
     try:
         with engine.connect() as conn:
             # Split by semicolon and execute each statement
             statements = [s.strip() for s in sql.split(';') if s.strip()]
             for statement in statements:
-                # Skip comments
-                if statement and not statement.startswith('--'):
-                    logger.info(f"Executing: {statement}")
-                    conn.execute(text(statement))
-                    conn.commit()
+                logger.info(f"Executing: {statement}")
+                conn.execute(text(statement))
+                conn.commit()
 
         logger.info("Migration applied successfully!")
         return True
@@ -30,4 +32,4 @@ def apply_migration():
         return False
 
 if __name__ == "__main__":
-    apply_migration()
+    apply_migration(*sys.argv[1:2])
@@ -0,0 +1,48 @@
+"""
+Shared test setup.
+
+The app's modules build SQL Server engines when they are imported, so every engine is pointed
+at one in-memory SQLite database (UNIQUEIDENTIFIER stored as CHAR(32)) before they load.
+"""
+import os
+import sys
+
+import pytest
+import sqlalchemy
+from sqlalchemy.dialects.mssql import UNIQUEIDENTIFIER
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for name in ("DB_SERVER", "DB_NAME", "DB_USERNAME", "DB_PASSWORD", "OPENAI_API_KEY"):
+    os.environ.setdefault(name, "test")
+
+@compiles(UNIQUEIDENTIFIER, "sqlite")
+def compile_uniqueidentifier(type_, compiler, **kw):
+    return "CHAR(32)"
+
+engine = sqlalchemy.create_engine(
+    "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+)
+sqlalchemy.create_engine = lambda *args, **kwargs: engine
+
+# models.py declares the full schema (including the embedding columns main.py doesn't map),
+# so its tables are created first
+import models  # noqa: E402
+
+models.Base.metadata.create_all(engine)
+
+@pytest.fixture
+def db():
+    from database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+        with engine.begin() as conn:
+            for table in reversed(models.Base.metadata.sorted_tables):
+                conn.execute(table.delete())
@@ -0,0 +1,48 @@
+from routers.database_import import ai_descriptions
+from routers.database_import.ai_descriptions import AIDescriptionGenerator
+from routers.database_import.models import TableField
+
+def make_fields():
+    return [
+        TableField(tableName="CUSTOMER", fieldName="CUSTOMER_ID", dataType="NUMBER",
+                   isNullable="NO", isPrimaryKey="YES", isForeignKey="NO"),
+        TableField(tableName="CUSTOMER", fieldName="BRANCH_CODE", dataType="VARCHAR2",
+                   isNullable="YES", isPrimaryKey="NO", isForeignKey="NO"),
+    ]
+
+def test_failed_model_call_is_not_cached(monkeypatch):
+    calls = []
+
+    def failing(prompt, max_tokens):
+        calls.append(prompt)
+        raise TimeoutError("request timed out")
+
+    monkeypatch.setattr(ai_descriptions, "_CACHE_TABLE", {})
+    monkeypatch.setattr(ai_descriptions, "_CACHE_FIELDS", {})
+    monkeypatch.setattr(ai_descriptions, "_ask_json", failing)
+    known = {}
+
+    table_description, fields = AIDescriptionGenerator.generate_descriptions("CUSTOMER", make_fields(), known=known)
+
+    assert table_description
+    assert all(f.description for f in fields)
+    schema_key = ai_descriptions._schema_hash("CUSTOMER", make_fields())
+    assert schema_key not in ai_descriptions._CACHE_TABLE
+    assert schema_key not in ai_descriptions._CACHE_FIELDS
+    assert known == {}
+
+    # The next import of the same table asks the model again
+    def answering(prompt, max_tokens):
+        calls.append(prompt)
+        return {
+            "description": "Customer master records held per branch",
+            "fields": {"CUSTOMER_ID": "Customer number", "BRANCH_CODE": "Home branch of the customer"},
+        }
+
+    monkeypatch.setattr(ai_descriptions, "_ask_json", answering)
+
+    table_description, fields = AIDescriptionGenerator.generate_descriptions("CUSTOMER", make_fields(), known=known)
+
+    assert len(calls) == 2
+    assert table_description == "Customer master records held per branch"
+    assert ai_descriptions._CACHE_TABLE[schema_key] == table_description
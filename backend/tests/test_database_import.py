@@ -0,0 +1,50 @@
+import importlib
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# The package re-exports its APIRouter as `router`, shadowing the module of the same name
+database_import = importlib.import_module("routers.database_import.router")
+
+SCHEMA_REQUEST = {
+    "server": "db", "database": "crm", "username": "reader", "password": "secret",
+    "type": "sqlserver", "source_id": "core", "tableName": "CUSTOMER"
+}
+
+def schema_client(monkeypatch, columns):
+    class Source:
+        def __init__(self, config):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            pass
+
+        def get_table_schema(self, table_name):
+            return columns
+
+    monkeypatch.setattr(database_import, "get_connection_handler", lambda kind: Source)
+    app = FastAPI()
+    app.include_router(database_import.router)
+    return TestClient(app)
+
+def column(**overrides):
+    return {"fieldName": "CUST_ID", "dataType": "int", "isNullable": "NO",
+            "isPrimaryKey": "YES", "isForeignKey": "NO", "defaultValue": None, **overrides}
+
+def test_schema_fields_match_the_worker_table_fields(monkeypatch):
+    client = schema_client(monkeypatch, [column()])
+
+    response = client.post("/schema", json=SCHEMA_REQUEST)
+
+    assert response.status_code == 200
+    assert response.json()["fields"] == [
+        field.model_dump() for field in database_import.build_table_fields("CUSTOMER", [column()])
+    ]
+
+def test_schema_rejects_malformed_handler_rows(monkeypatch):
+    client = schema_client(monkeypatch, [column(isNullable=True)])
+
+    assert client.post("/schema", json=SCHEMA_REQUEST).status_code == 400
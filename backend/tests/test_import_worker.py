@@ -0,0 +1,149 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import import_worker
+from database import SessionLocal
+from models import ImportJob
+
+def add_job(db, status, minutes_since_update):
+    job = ImportJob(
+        user_id="analyst",
+        config={"selected_tables": ["CUSTOMER"]},
+        status=status,
+        updated_at=datetime.utcnow() - timedelta(minutes=minutes_since_update),
+    )
+    db.add(job)
+    db.commit()
+    return job.id
+
+def claim_from_another_worker(job_id):
+    other = SessionLocal()
+    try:
+        return import_worker.claim_job(job_id, other)
+    finally:
+        other.close()
+
+def test_pending_job_is_claimed_once(db):
+    job_id = add_job(db, "pending", 0)
+
+    assert claim_from_another_worker(job_id)
+    assert not claim_from_another_worker(job_id)
+
+def test_orphaned_job_is_taken_over(db):
+    job_id = add_job(db, "in_progress", import_worker.STALE_JOB_MINUTES + 5)
+
+    assert claim_from_another_worker(job_id)
+
+def test_live_job_with_a_slow_batch_is_not_taken_over(db, monkeypatch):
+    # The owning worker has written no batch for longer than the takeover threshold,
+    # but its heartbeat is still running
+    monkeypatch.setattr(import_worker, "HEARTBEAT_SECONDS", 0.05)
+    job_id = add_job(db, "in_progress", import_worker.STALE_JOB_MINUTES + 5)
+
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=import_worker.keep_job_alive, args=(job_id, stop))
+    heartbeat.start()
+    try:
+        time.sleep(0.3)
+        assert not claim_from_another_worker(job_id)
+    finally:
+        stop.set()
+        heartbeat.join()
+
+def test_heartbeat_leaves_finished_jobs_alone(db, monkeypatch):
+    monkeypatch.setattr(import_worker, "HEARTBEAT_SECONDS", 0.05)
+    job_id = add_job(db, "completed", 60)
+    before = db.get(ImportJob, job_id).updated_at
+
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=import_worker.keep_job_alive, args=(job_id, stop))
+    heartbeat.start()
+    time.sleep(0.2)
+    stop.set()
+    heartbeat.join()
+
+    db.expire_all()
+    assert db.get(ImportJob, job_id).updated_at == before
+
+def test_cancel_between_batches_stops_the_job(db, monkeypatch):
+    from routers.database_import.ai_descriptions import AIDescriptionGenerator
+
+    tables = [f"TABLE_{i}" for i in range(10)]
+    described = []
+    checks = []
+    checked = threading.Event()
+    rechecked = threading.Event()
+
+    class Source:
+        def __init__(self, config):
+            pass
+
+        def connect(self):
+            pass
+
+        def disconnect(self):
+            pass
+
+        def get_table_schema(self, table_name):
+            return [{"fieldName": "ID", "dataType": "int", "isNullable": "NO",
+                     "isPrimaryKey": "YES", "isForeignKey": "NO", "defaultValue": None}]
+
+        def get_table_count(self, table_name):
+            return 1
+
+    def describe(table_name, table_fields, *args, **kwargs):
+        described.append(table_name)
+        if len(described) == 2:
+            # The user cancels once the worker has already looked at the job
+            checked.wait(5)
+            api = SessionLocal()
+            api.query(ImportJob).filter(ImportJob.id == job_id).update({ImportJob.status: "cancelled"})
+            api.commit()
+            api.close()
+        elif len(described) > 2:
+            # Later tables wait for the worker's next check and, if it saw the cancel, for the
+            # unstarted tables to be dropped (the pool is shut down only after that)
+            rechecked.wait(5)
+        return f"{table_name} table", table_fields
+
+    def check_job_cancelled(job_id, db):
+        cancelled = original_check(job_id, db)
+        checks.append(cancelled)
+        if len(checks) == 1:
+            checked.set()
+        elif not cancelled:
+            rechecked.set()
+        return cancelled
+
+    class Pool(import_worker.ThreadPoolExecutor):
+        def shutdown(self, *args, **kwargs):
+            rechecked.set()
+            super().shutdown(*args, **kwargs)
+
+    original_check = import_worker.check_job_cancelled
+    monkeypatch.setattr(import_worker, "check_job_cancelled", check_job_cancelled)
+    monkeypatch.setattr(import_worker, "ThreadPoolExecutor", Pool)
+    monkeypatch.setattr(import_worker, "get_connection_handler", lambda kind: Source)
+    monkeypatch.setattr(import_worker, "embed_table", lambda *args: None)
+    monkeypatch.setattr(AIDescriptionGenerator, "generate_descriptions", describe)
+    monkeypatch.setattr(import_worker, "IMPORT_WORKERS", 1)
+    monkeypatch.setattr(import_worker, "CANCEL_CHECK_SECONDS", 0)
+
+    job = ImportJob(user_id="analyst", status="in_progress", config={
+        "selected_tables": tables, "database": "crm", "type": "sqlserver"
+    })
+    db.add(job)
+    db.commit()
+    job_id = job.id
+
+    worker = SessionLocal()
+    try:
+        import_worker.process_import_job(job_id, worker)
+    finally:
+        worker.close()
+
+    db.expire_all()
+    assert db.get(ImportJob, job_id).status == "cancelled"
+    assert checks == [False, True]
+    assert len(described) == 3
@@ -0,0 +1,66 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import models
+
+@pytest.fixture
+def client():
+    main.app.dependency_overrides[main.get_current_user] = lambda: {"username": "admin", "role": "admin"}
+    try:
+        yield TestClient(main.app)
+    finally:
+        main.app.dependency_overrides.clear()
+
+def add_table(db):
+    source = models.SourceSystem(name="core")
+    db.add(source)
+    db.flush()
+    database = models.Database(name="crm", source_id=source.id)
+    db.add(database)
+    db.flush()
+    table = models.Table(name="customer", description="Customer master", database_id=database.id, embedding=b"t")
+    db.add(table)
+    db.flush()
+    field = models.Field(name="customer_id", type="int", table_id=table.id, embedding=b"f")
+    db.add(field)
+    db.commit()
+    return table.id, field.id
+
+def embeddings(db, table_id, field_id):
+    db.expire_all()
+    return db.get(models.Table, table_id).embedding, db.get(models.Field, field_id).embedding
+
+def test_renaming_a_table_clears_its_and_its_fields_embeddings(client, db):
+    table_id, field_id = add_table(db)
+
+    response = client.put(f"/tables/{table_id}", json={"name": "client"})
+
+    assert response.status_code == 200
+    assert embeddings(db, table_id, field_id) == (None, None)
+
+def test_editing_a_table_description_keeps_field_embeddings(client, db):
+    table_id, field_id = add_table(db)
+
+    response = client.put(f"/tables/{table_id}", json={"description": "Clients"})
+
+    assert response.status_code == 200
+    assert embeddings(db, table_id, field_id) == (None, b"f")
+
+def test_editing_a_field_clears_its_embedding(client, db):
+    table_id, field_id = add_table(db)
+
+    response = client.put(f"/fields/{field_id}", json={"description": "Customer number"})
+
+    assert response.status_code == 200
+    assert embeddings(db, table_id, field_id) == (b"t", None)
+
+def test_other_table_edits_keep_embeddings(client, db):
+    table_id, field_id = add_table(db)
+
+    response = client.put(f"/tables/{table_id}", json={"record_count": 10})
+
+    assert response.status_code == 200
+    assert embeddings(db, table_id, field_id) == (b"t", b"f")
@@ -0,0 +1,118 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+from routers import search
+
+def test_importing_search_starts_no_embedding_threads():
+    # A fresh interpreter, so no earlier test has started the workers; conftest points the
+    # engines at SQLite before search is imported
+    check = (
+        "import threading, conftest, routers.search; "
+        "assert not [t for t in threading.enumerate() if t.name == 'query-embedding']"
+    )
+    subprocess.run([sys.executable, "-c", check], cwd=os.path.dirname(__file__), check=True)
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+def test_queries_queued_behind_busy_workers_share_one_request(monkeypatch):
+    workers = search.QUERY_EMBEDDING_WORKERS
+    requests = []
+    gates = []
+
+    def fake_embeddings(texts):
+        gate = threading.Event()
+        gates.append(gate)
+        requests.append(list(texts))
+        gate.wait(5)
+        return np.array([[len(text)] * search.EMBEDDING_DIMENSIONS for text in texts], dtype=np.float32)
+
+    monkeypatch.setattr(search, "get_embeddings", fake_embeddings)
+    search.embed_query.cache_clear()
+    queries = [f"customer {'x' * i}" for i in range(workers + 8)]
+    results = {}
+
+    def embed(query):
+        results[query] = search.embed_query(query)
+
+    threads = [threading.Thread(target=embed, args=(query,)) for query in queries]
+    # Every worker takes one query and blocks on it; the rest wait in the queue
+    for i, thread in enumerate(threads[:workers]):
+        thread.start()
+        wait_until(lambda: len(requests) == i + 1)
+    for thread in threads[workers:]:
+        thread.start()
+    wait_until(lambda: search._pending_queries.qsize() == len(queries) - workers)
+
+    # The first worker to come free embeds everything queued in a single request
+    gates[0].set()
+    wait_until(lambda: len(requests) == workers + 1)
+    assert sorted(requests[workers]) == sorted(queries[workers:])
+
+    for gate in gates:
+        gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(requests) == workers + 1
+    for query in queries:
+        assert results[query][0] == len(query)
+        assert not results[query].flags.writeable
+
+def test_contains_pattern_escapes_like_wildcards():
+    assert search.contains_pattern("cust_id") == "%cust\\_id%"
+    assert search.contains_pattern("50%") == "%50\\%%"
+    assert search.contains_pattern("[a]\\b") == "%\\[a]\\\\b%"
+
+def search_client(db):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    import database
+
+    app = FastAPI()
+    app.include_router(search.router)
+    app.dependency_overrides[database.get_db] = lambda: db
+    return TestClient(app)
+
+def add_tables(db, *tables):
+    """Tables (name, stored embedding or None) in one source and database"""
+    import models
+
+    source = models.SourceSystem(name="core")
+    db.add(source)
+    db.flush()
+    crm = models.Database(name="crm", source_id=source.id)
+    db.add(crm)
+    db.flush()
+    for name, embedding in tables:
+        db.add(models.Table(name=name, database_id=crm.id, embedding=embedding))
+    db.commit()
+
+def axis(index):
+    vector = np.zeros(search.EMBEDDING_DIMENSIONS, dtype=np.float32)
+    vector[index] = 1.0
+    return vector
+
+def test_search_ranks_rows_that_share_no_word_with_the_query(db, monkeypatch):
+    add_tables(db, ("CUST_BAL", search.embedding_to_bytes(axis(0))), ("BRANCH", search.embedding_to_bytes(axis(1))))
+    monkeypatch.setattr(search, "embed_query", lambda query: axis(0))
+
+    response = search_client(db).post("/search", json={"query": "customer balance", "type_filter": "table"}).json()
+
+    assert [result["name"] for result in response["results"]] == ["CUST_BAL"]
+
+def test_suggestions_match_wildcard_characters_literally(db):
+    add_tables(db, ("CUST_ID", None), ("CUSTOMER", None), ("RATE_50%", None))
+    client = search_client(db)
+
+    assert client.get("/search/suggestions", params={"prefix": "cust_"}).json()["tables"] == ["CUST_ID"]
+    assert client.get("/search/suggestions", params={"prefix": "50%"}).json()["tables"] == ["RATE_50%"]
@@ -1,105 +1,72 @@
-import os
 import logging
-from sqlalchemy import text
-from openai import OpenAI
-from database import SessionLocal, engine
-from dotenv import load_dotenv
+from sqlalchemy import update
+from database import SessionLocal
+from models import SourceSystem, Database, Table, Field
+from routers.search import (
+    EMBEDDING_BATCH_SIZE, EMBEDDING_CONCURRENCY, get_embeddings, embedding_to_bytes,
+    table_embedding_text, field_embedding_text
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
+# Rows embedded (concurrently, in API-sized batches) and committed per step
+STEP_SIZE = EMBEDDING_BATCH_SIZE * EMBEDDING_CONCURRENCY
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-
-def get_embedding(text: str) -> bytes:
-    """Get embedding for text using OpenAI's API"""
-    try:
-        response = client.embeddings.create(
-            model="text-embedding-ada-002",
-            input=text
-        )
-        # Convert embedding to bytes for storage
-        return bytes(str(response.data[0].embedding).encode())
-    except Exception as e:
-        logger.error(f"Error getting embedding: {str(e)}")
-        raise
+def store_batch(db, model, ids, texts):
+    """Embed a step's texts and store the results in one commit"""
+    embeddings = get_embeddings(texts)
+    db.execute(update(model), [
+        {"id": row_id, "embedding": embedding_to_bytes(embedding)}
+        for row_id, embedding in zip(ids, embeddings)
+    ])
+    db.commit()
 
 def update_table_embeddings():
-    """Update embeddings for all tables"""
+    """Update embeddings for all tables that don't have one yet"""
     db = SessionLocal()
     try:
-        # Get all tables that need embeddings
-        tables = db.execute(text("""
-            SELECT 
-                t.id,
-                dbo.GenerateTableEmbeddingText(
-                    t.name,
-                    t.description,
-                    d.name,
-                    s.name,
-                    ISNULL(c.name, 'Uncategorized')
-                ) as embedding_text
-            FROM tables t
-            JOIN databases d ON t.database_id = d.id
-            JOIN source_systems s ON d.source_id = s.id
-            LEFT JOIN categories c ON t.category_id = c.id
-            WHERE t.embedding IS NULL
-        """)).fetchall()
+        tables = db.query(Table.id, Table.name, Table.description)\
+            .join(Database, Table.database_id == Database.id)\
+            .join(SourceSystem, Database.source_id == SourceSystem.id)\
+            .filter(Table.embedding.is_(None)).all()
 
-        for table in tables:
+        for start in range(0, len(tables), STEP_SIZE):
+            batch = tables[start:start + STEP_SIZE]
             try:
-                embedding = get_embedding(table.embedding_text)
-                db.execute(
-                    text("UPDATE tables SET embedding = :embedding WHERE id = :id"),
-                    {"embedding": embedding, "id": table.id}
+                store_batch(
+                    db, Table, [table.id for table in batch],
+                    [table_embedding_text(table.name, table.description) for table in batch]
                 )
-                db.commit()
-                logger.info(f"Updated embedding for table {table.id}")
+                logger.info(f"Updated embeddings for {start + len(batch)}/{len(tables)} tables")
             except Exception as e:
-                logger.error(f"Error updating table {table.id}: {str(e)}")
+                logger.error(f"Error updating tables {start}-{start + len(batch)}: {str(e)}")
                 db.rollback()
 
     finally:
         db.close()
 
 def update_field_embeddings():
-    """Update embeddings for all fields"""
+    """Update embeddings for all fields that don't have one yet"""
     db = SessionLocal()
     try:
-        # Get all fields that need embeddings
-        fields = db.execute(text("""
-            SELECT 
-                f.id,
-                dbo.GenerateFieldEmbeddingText(
-                    f.name,
-                    f.description,
-                    f.type,
-                    t.name,
-                    d.name,
-                    s.name
-                ) as embedding_text
-            FROM fields f
-            JOIN tables t ON f.table_id = t.id
-            JOIN databases d ON t.database_id = d.id
-            JOIN source_systems s ON d.source_id = s.id
-            WHERE f.embedding IS NULL
-        """)).fetchall()
+        fields = db.query(Field.id, Field.name, Field.description, Field.type, Table.name.label('table_name'))\
+            .join(Table, Field.table_id == Table.id)\
+            .join(Database, Table.database_id == Database.id)\
+            .join(SourceSystem, Database.source_id == SourceSystem.id)\
+            .filter(Field.embedding.is_(None)).all()
 
-        for field in fields:
+        for start in range(0, len(fields), STEP_SIZE):
+            batch = fields[start:start + STEP_SIZE]
             try:
-                embedding = get_embedding(field.embedding_text)
-                db.execute(
-                    text("UPDATE fields SET embedding = :embedding WHERE id = :id"),
-                    {"embedding": embedding, "id": field.id}
+                store_batch(
+                    db, Field, [field.id for field in batch],
+                    [field_embedding_text(field.name, field.description, field.type, field.table_name) for field in batch]
                 )
-                db.commit()
-                logger.info(f"Updated embedding for field {field.id}")
+                logger.info(f"Updated embeddings for {start + len(batch)}/{len(fields)} fields")
             except Exception as e:
-                logger.error(f"Error updating field {field.id}: {str(e)}")
+                logger.error(f"Error updating fields {start}-{start + len(batch)}: {str(e)}")
                 db.rollback()
 
     finally:
@@ -109,4 +76,4 @@ if __name__ == "__main__":
     logger.info("Starting embedding updates...")
     update_table_embeddings()
     update_field_embeddings()
-    logger.info("Embedding updates completed")
\ No newline at end of file
+    logger.info("Embedding updates completed")